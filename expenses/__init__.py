@@ -5,16 +5,23 @@ This module initializes the Flask application with database,
 caching, and API routing configurations.
 """
 import os, json
-from flask import Flask, redirect, request, Response, url_for
-from flask_sqlalchemy import SQLAlchemy
-from flask_caching import Cache
-from werkzeug.exceptions import NotFound, Conflict, BadRequest, UnsupportedMediaType, Forbidden
+import sqlite3
+import orjson
+from flask import Flask, redirect, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from werkzeug.exceptions import (
+    NotFound,
+    Conflict,
+    BadRequest,
+    UnsupportedMediaType,
+    Forbidden,
+    InternalServerError,
+)
 from flask_cors import CORS
 
-# Import these at the top level to avoid import-outside-toplevel warnings
-
-db = SQLAlchemy()
-cache = Cache()
+from expenses.extensions import db, cache
 
 available_routes = {
         "User Endpoints": [
@@ -50,76 +57,187 @@ available_routes = {
         ]
     }
 
-def handle_not_found(error):
+def engine_options(database_uri):
     """
-    Custom 404 error handler that returns a JSON response with the error message first,
-    followed by available API endpoints.
+    Build SQLAlchemy engine options suited to the configured database.
+
+    File-backed and server databases get an explicitly sized connection pool.
+    The sizing can be retuned per deployment through the ``DB_POOL_SIZE``,
+    ``DB_MAX_OVERFLOW`` and ``DB_POOL_RECYCLE`` environment variables.
+    In-memory SQLite is left to Flask-SQLAlchemy, which pins it to a single
+    shared connection.
+
+    Args:
+        database_uri (str): The SQLAlchemy database URI.
+
+    Returns:
+        dict: Options passed to ``create_engine``.
     """
-    response_data = {
-        "error": "Not Found",
-        "message": "The requested URL was not found on the server.",
-        "available_routes": available_routes,
+    if database_uri in ("sqlite://", "sqlite:///:memory:"):
+        return {}
+
+    options = {
+        "poolclass": QueuePool,
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 20)),
+        "pool_pre_ping": True,
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+        # Room for every statement shape the API issues, so compiled SQL is
+        # never evicted from SQLAlchemy's statement cache under load.
+        "query_cache_size": 1000,
     }
+    if database_uri.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    return options
 
-    # Convert to JSON string with `ensure_ascii=False` to prevent escaping
-    response_json = json.dumps(response_data, ensure_ascii=False, indent=4)
 
-    return Response(response_json, status=404, mimetype="application/json")
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):  # pylint: disable=unused-argument
+    """
+    Tune every new SQLite connection for concurrent web traffic.
 
+    WAL lets readers proceed while a write is in progress, and NORMAL
+    synchronous mode only fsyncs at checkpoints, which is safe under WAL.
+    A 64 MiB page cache keeps hot index pages in memory between queries.
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
 
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.close()
 
 
-def handle_bad_request(error):
+def warm_up_engine(app):
     """
-    Handle 400 Bad Request errors by returning JSON response.
-    
+    Open the first database connection while the app starts up.
+
+    Connecting at boot runs the per-connection setup (pragmas, pool checkout)
+    before any request arrives, and surfaces an unreachable database as a
+    startup error instead of a failed first request. The schema itself is
+    created ahead of time by ``flask init-db``, never during requests.
+
     Args:
-        error: The exception object raised.
-        
-    Returns:
-        tuple: JSON error response and 400 status code.
+        app (Flask): The application whose engine should be warmed up.
     """
-    return {"message": str(error)}, 400
+    with app.app_context():
+        with db.engine.connect() as connection:
+            connection.exec_driver_sql("SELECT 1")
 
-def handle_unsupported_media_type(error):
+
+def register_converters(app):
     """
-    Handle 415 Unsupported Media Type errors by returning JSON response.
-    
+    Register the model URL converters.
+
+    The converters live in :mod:`expenses.utils`, which pulls in the models
+    and query helpers, so it is only imported when routes are registered.
+
     Args:
-        error: The exception object raised.
-        
-    Returns:
-        tuple: JSON error response and 415 status code.
+        app (Flask): The application to register the converters on.
     """
-    return {"message": str(error)}, 415
+    from expenses.utils import (  # pylint: disable=import-outside-toplevel
+        UserConverter,
+        GroupConverter,
+        ExpenseConverter,
+    )
+
+    app.url_map.converters.update(
+        user=UserConverter, group=GroupConverter, expense=ExpenseConverter
+    )
+
 
-def handle_conflict(error):
+# Top-level resources that are also reachable without the /api prefix.
+LEGACY_RESOURCES = "any(users, groups, expenses)"
+
+
+def redirect_to_api(resource, rest=""):
     """
-    Handle 409 Conflict errors by returning JSON response.
-    
+    Permanently redirect a path that is missing the /api prefix.
+
+    A 308 keeps the request method and body, and the redirect is marked
+    cacheable for a year so clients and proxies stop asking the app.
+
     Args:
-        error: The exception object raised.
-        
+        resource (str): The top-level resource name from the URL.
+        rest (str): The remainder of the path, if any.
+
     Returns:
-        tuple: JSON error response and 409 status code.
+        Response: A 308 redirect to the same path under /api.
     """
-    return {"message": str(error)}, 409
+    response = redirect(f"/api/{resource}/{rest}", code=308)
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
 
-def handle_forbidden(error):
+
+# The 404 body only depends on the static route table, so it is encoded once.
+NOT_FOUND_BODY = json.dumps(
+    {
+        "error": "Not Found",
+        "message": "The requested URL was not found on the server.",
+        "available_routes": available_routes,
+    },
+    ensure_ascii=False,
+    indent=4,
+).encode("utf-8")
+
+
+def handle_not_found(error):  # pylint: disable=unused-argument
     """
-    Handle 403 Forbidden errors by returning JSON response.
-    
+    Custom 404 error handler that returns a JSON response with the error message first,
+    followed by available API endpoints.
+    """
+    return Response(NOT_FOUND_BODY, status=404, mimetype="application/json")
+
+
+# Exceptions answered with a JSON {"message": ...} body, and their status codes.
+# Flask hands unhandled exceptions to the InternalServerError handler, so the
+# plain collection views answer those in JSON too, like Flask-RESTful does.
+JSON_ERRORS = (
+    (BadRequest, 400),
+    (Forbidden, 403),
+    (Conflict, 409),
+    (UnsupportedMediaType, 415),
+    (InternalServerError, 500),
+)
+
+
+def make_error_handler(exc_class, code):
+    """
+    Build an error handler that returns the exception message as JSON.
+
+    Errors raised with Werkzeug's default description always produce the
+    same body, so that body is encoded once up front and reused. Custom
+    messages are encoded with orjson, and both cases return a ready
+    Response so Flask's return-value coercion is skipped.
+
     Args:
-        error: The exception object raised.
-        
+        exc_class: The HTTPException subclass being handled.
+        code (int): The HTTP status code to respond with.
+
     Returns:
-        tuple: JSON error response and 403 status code.
+        Function handling ``exc_class`` errors.
     """
-    return {"message": str(error)}, 403
+    default_body = orjson.dumps({"message": str(exc_class())})
 
+    def handle_error(error):
+        if error.description == exc_class.description:
+            body = default_body
+        else:
+            body = orjson.dumps({"message": str(error)})
+        return Response(body, status=code, mimetype="application/json")
 
+    return handle_error
 
 
+# Built once at import time and shared by every application instance.
+ERROR_HANDLERS = (
+    (NotFound, handle_not_found),
+    *((exc_class, make_error_handler(exc_class, code)) for exc_class, code in JSON_ERRORS),
+)
 
 
 def create_app(test_config=None):
@@ -137,8 +255,15 @@ def create_app(test_config=None):
         SECRET_KEY="dev",
         SQLALCHEMY_DATABASE_URI="sqlite:///" + os.path.join(app.instance_path, "development.db"),
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
-        CACHE_TYPE="FileSystemCache",
+        # SimpleCache is per process; multi-worker deployments should set
+        # CACHE_TYPE to RedisCache (with CACHE_REDIS_URL) or FileSystemCache
+        # so revision bumps are seen by every worker.
+        CACHE_TYPE=os.environ.get("CACHE_TYPE", "SimpleCache"),
+        CACHE_REDIS_URL=os.environ.get("CACHE_REDIS_URL"),
         CACHE_DIR=os.path.join(app.instance_path, "cache"),
+        CACHE_DEFAULT_TIMEOUT=int(os.environ.get("CACHE_DEFAULT_TIMEOUT", 300)),
+        CACHE_KEY_PREFIX=os.environ.get("CACHE_KEY_PREFIX", "expenses:"),
+        CLI_ONLY=bool(os.environ.get("CLI_ONLY")),
     )
 
     if test_config is None:
@@ -146,48 +271,50 @@ def create_app(test_config=None):
     else:
         app.config.from_mapping(test_config)
 
-    try:
-        os.makedirs(app.instance_path)
-    except OSError:
-        pass
+    app.config.setdefault(
+        "SQLALCHEMY_ENGINE_OPTIONS",
+        engine_options(app.config["SQLALCHEMY_DATABASE_URI"]),
+    )
+
+    os.makedirs(app.instance_path, exist_ok=True)
 
     db.init_app(app)
     cache.init_app(app)
 
     from expenses.models import init_db_command
-    from expenses.utils import UserConverter, GroupConverter, ExpenseConverter
     
     app.cli.add_command(init_db_command)
 
-    # Register URL converters
-    app.url_map.converters['user'] = UserConverter
-    app.url_map.converters['group'] = GroupConverter
-    app.url_map.converters['expense'] = ExpenseConverter
+    # CLI-only runs (e.g. ``flask init-db``) never serve requests, so they
+    # skip importing the converters, resources and Flask-RESTful entirely.
+    if not app.config["CLI_ONLY"]:
+        register_converters(app)
 
+        from expenses.api import api_bp
 
-    from expenses.api import api_bp
-    
-    app.register_blueprint(api_bp)
-
-    @app.before_request
-    def redirect_if_missing_api():
+        app.register_blueprint(api_bp)
 
-        path = request.path
-        valid_api_routes = ["/users", "/groups", "/expenses"]
-
-        for route in valid_api_routes:
-            if path.startswith(route) and not path.startswith("/api"):
-                return redirect(f"/api{path}/", code=301)  # Permanent redirect
+    # Paths missing the /api prefix are redirected by the URL map itself, so
+    # ordinary API requests pay nothing for the legacy routes.
+    app.add_url_rule(
+        f"/<{LEGACY_RESOURCES}:resource>/",
+        "redirect_to_api",
+        redirect_to_api,
+        strict_slashes=False,
+    )
+    app.add_url_rule(
+        f"/<{LEGACY_RESOURCES}:resource>/<path:rest>",
+        "redirect_to_api",
+        redirect_to_api,
+    )
 
-    app.errorhandler(NotFound)(handle_not_found)
-    app.errorhandler(BadRequest)(handle_bad_request)
-    app.errorhandler(UnsupportedMediaType)(handle_unsupported_media_type)
-    app.errorhandler(Conflict)(handle_conflict)
-    app.errorhandler(Forbidden)(handle_forbidden)
+    for exc_class, handler in ERROR_HANDLERS:
+        app.register_error_handler(exc_class, handler)
 
 
     
     CORS(app, resources={r"/*": {"origins": "*"}})
+    warm_up_engine(app)
     return app
 
 
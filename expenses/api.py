@@ -4,31 +4,108 @@ This module defines the Flask Blueprint and RESTful API
 routes for the expenses application.
 """
 
-from flask import Blueprint
-from flask_restful import Api, Resource
+import orjson
+from flask import Blueprint, current_app
+from flask_restful import Api
+from flask_restful.utils import unpack
+from werkzeug.wrappers import Response
 from expenses.resources.user import UserCollection, UserItem
 from expenses.resources.group import GroupCollection, GroupItem
 from expenses.resources.group_member import GroupMemberCollection, GroupMemberItem
 from expenses.resources.expense import ExpenseCollection, ExpenseItem, ExpenseParticipantCollection
 from expenses import available_routes
+from expenses.utils import dump_json
 
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 api = Api(api_bp)
 
-# Simple root endpoint
-class Root(Resource):
-    def get(self):
-        return {"available_routes": available_routes}, 200
+
+@api.representation("application/json")
+def output_json(data, code, headers=None):
+    """
+    Serialize resource responses with :func:`expenses.utils.dump_json`.
+
+    Args:
+        data: Response document returned by the resource
+        code: HTTP status code
+        headers: Extra response headers
+
+    Returns:
+        Response: The JSON response
+    """
+    return current_app.response_class(
+        dump_json(data),
+        status=code,
+        headers=headers,
+        mimetype="application/json",
+    )
+
+
+# The root document is static, so it is encoded once at import time.
+ROOT_BODY = orjson.dumps({"available_routes": available_routes})
+
+
+def root_view():
+    """Serve the pre-encoded list of available routes."""
+    return current_app.response_class(ROOT_BODY, mimetype="application/json")
+
+
+api_bp.add_url_rule('/', 'root', root_view)
 
 # Register API endpoints
-api.add_resource(Root, '/')
-api.add_resource(UserCollection, '/users/')
-api.add_resource(UserItem, '/users/<user:user>')
-api.add_resource(GroupCollection, '/groups/')
-api.add_resource(GroupItem, '/groups/<group:group>')
-api.add_resource(GroupMemberCollection, '/groups/<group:group>/members/')
-api.add_resource(GroupMemberItem, '/groups/<group:group>/members/<user:user>')
-api.add_resource(ExpenseCollection, '/groups/<group:group>/expenses/')
-api.add_resource(ExpenseItem, '/expenses/<expense:expense>')
-api.add_resource(ExpenseParticipantCollection, '/expenses/<expense:expense>/participants/')
+ROUTES = (
+    (UserItem, '/users/<user:user>'),
+    (GroupItem, '/groups/<group:group>'),
+    (GroupMemberItem, '/groups/<group:group>/members/<user:user>'),
+    (ExpenseItem, '/expenses/<expense:expense>'),
+)
+
+for resource_class, rule in ROUTES:
+    api.add_resource(resource_class, rule)
+
+# Collection GETs are the busiest endpoints, so they are served by plain view
+# functions; the remaining methods of those resources stay on Flask-RESTful.
+HOT_COLLECTIONS = (
+    (UserCollection, '/users/'),
+    (GroupCollection, '/groups/'),
+    (GroupMemberCollection, '/groups/<group:group>/members/'),
+    (ExpenseCollection, '/groups/<group:group>/expenses/'),
+    (ExpenseParticipantCollection, '/expenses/<expense:expense>/participants/'),
+)
+
+
+def collection_view(resource):
+    """
+    Expose a resource's GET handler as a plain Flask view function.
+
+    This skips Flask-RESTful's dispatch and content negotiation; the handler
+    result is encoded directly with :func:`output_json`.
+
+    Args:
+        resource: The Resource subclass whose ``get`` is exposed
+
+    Returns:
+        function: View function for ``Blueprint.add_url_rule``
+    """
+    handler = resource().get
+
+    def view(**kwargs):
+        result = handler(**kwargs)
+        if isinstance(result, Response):
+            return result
+        data, code, headers = unpack(result)
+        return output_json(data, code, headers)
+
+    return view
+
 
+for resource_class, rule in HOT_COLLECTIONS:
+    api_bp.add_url_rule(
+        rule,
+        f"{resource_class.__name__.lower()}_get",
+        collection_view(resource_class),
+        methods=["GET"],
+    )
+    other_methods = sorted(resource_class.methods - {"GET"})
+    if other_methods:
+        api.add_resource(resource_class, rule, methods=other_methods)
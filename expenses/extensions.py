@@ -0,0 +1,13 @@
+"""
+Flask extension instances shared across the application.
+
+The extensions are created unbound here and initialized by create_app().
+Keeping them out of the package module lets the models and helpers import
+them without importing the application factory.
+"""
+
+from flask_caching import Cache
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
+cache = Cache()
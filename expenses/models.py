@@ -6,25 +6,215 @@ expense tracking system: users, groups, expenses, and related relationships.
 """
 
 import hashlib
+import os
+import threading
 import uuid
-from datetime import datetime, UTC
+from decimal import Decimal, ROUND_HALF_UP
 
 import click
 from flask.cli import with_appcontext
-from flask_sqlalchemy import SQLAlchemy
+from jsonschema import validators
+from jsonschema.exceptions import best_match
+from sqlalchemy import event, insert, inspect, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.types import BINARY, String, TypeDecorator
 from werkzeug.security import generate_password_hash
 
-db = SQLAlchemy()
+from expenses.extensions import db
+
+_sha256 = hashlib.sha256
+
+# Password hashing method for generated sample users only
+TEST_DATA_PASSWORD_METHOD = "pbkdf2:sha256:1000"
+
+
+# Random UUIDs are generated in batches: one os.urandom call per batch
+# instead of one per inserted row.
+UUID_BATCH_SIZE = 256
+_uuid_pool = threading.local()
+
+
+def _reset_uuid_pool():
+    """Drop pre-generated UUIDs so a forked worker never reuses its parent's."""
+    global _uuid_pool  # pylint: disable=global-statement
+    _uuid_pool = threading.local()
+
+
+os.register_at_fork(after_in_child=_reset_uuid_pool)
+
+
+def generate_uuid_batch(size=UUID_BATCH_SIZE):
+    """
+    Generate a batch of random (version 4) UUID strings.
+
+    Args:
+        size (int): Number of UUIDs to generate.
+
+    Returns:
+        list: UUID strings in canonical 8-4-4-4-12 form.
+    """
+    raw = bytearray(os.urandom(16 * size))
+    raw[6::16] = bytes((byte & 0x0F) | 0x40 for byte in raw[6::16])
+    raw[8::16] = bytes((byte & 0x3F) | 0x80 for byte in raw[8::16])
+    digits = raw.hex()
+    return [
+        f"{digits[i:i + 8]}-{digits[i + 8:i + 12]}-{digits[i + 12:i + 16]}-"
+        f"{digits[i + 16:i + 20]}-{digits[i + 20:i + 32]}"
+        for i in range(0, len(digits), 32)
+    ]
 
 
 def get_uuid():
     """Generate a unique UUID string for model IDs."""
-    return str(uuid.uuid4())
+    pool = getattr(_uuid_pool, "ids", None)
+    if not pool:
+        pool = _uuid_pool.ids = generate_uuid_batch()
+    return pool.pop()
+
+
+def to_cents(value):
+    """
+    Convert a money amount in currency units to integer cents.
+
+    Args:
+        value: Amount as an int, float, Decimal or numeric string.
+
+    Returns:
+        int: The amount in cents, rounded half up; None stays None.
+    """
+    if value is None:
+        return None
+    return int((Decimal(str(value)) * 100).to_integral_value(ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    """
+    Convert integer cents to a money amount in currency units.
+
+    Args:
+        cents (int): Amount in cents.
+
+    Returns:
+        float: The amount in currency units; None stays None.
+    """
+    return None if cents is None else cents / 100
 
 
-def get_current_time():
-    """Get current UTC time for timestamps."""
-    return datetime.now(UTC)
+def compile_validator(schema):
+    """
+    Build a reusable validation function for a JSON schema.
+
+    The validator class is resolved and the schema checked against its
+    meta-schema once, so each call only walks the instance. Errors match
+    ``jsonschema.validate``, which raises the best-matching
+    :class:`jsonschema.ValidationError`.
+
+    Args:
+        schema (dict): The JSON schema to validate against.
+
+    Returns:
+        Function taking an instance and raising ValidationError if invalid.
+
+    Raises:
+        SchemaError: If the schema itself is invalid
+    """
+    validator_class = validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    validator = validator_class(schema)
+
+    def validate(instance):
+        error = best_match(validator.iter_errors(instance))
+        if error is not None:
+            raise error
+
+    return validate
+
+
+class UUIDString(TypeDecorator):  # pylint: disable=too-many-ancestors
+    """
+    UUID column stored compactly but exposed to Python as a canonical string.
+
+    PostgreSQL uses its native UUID type; other databases store the 16 raw
+    bytes instead of 36 characters of text, which also halves the size of
+    the unique index. Writing a value that is not a valid UUID raises
+    ValueError, while comparisons against one use UUIDMatch and match nothing.
+    """
+
+    impl = BINARY(16)
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return str
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID())
+        return dialect.type_descriptor(self.impl)
+
+    def coerce_compared_value(self, op, value):
+        return UUIDMatch()
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            parsed = value if isinstance(value, uuid.UUID) else uuid.UUID(value)
+        except (AttributeError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid UUID: {value!r}") from e
+        return str(parsed) if dialect.name == "postgresql" else parsed.bytes
+
+    def literal_processor(self, dialect):
+        # BINARY would render the raw bytes as text, so the whole literal is
+        # built by process_literal_param
+        def process(value):
+            return self.process_literal_param(value, dialect)
+
+        return process
+
+    def process_literal_param(self, value, dialect):
+        value = self.process_bind_param(value, dialect)
+        if value is None:
+            return "NULL"
+        if dialect.name == "postgresql":
+            return f"'{value}'"
+        return f"X'{value.hex()}'"
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        return str(uuid.UUID(bytes=bytes(value)))
+
+
+class UUIDMatch(UUIDString):  # pylint: disable=too-many-ancestors
+    """
+    UUIDString for the right-hand side of comparisons.
+
+    Values that are not valid UUIDs bind as NULL, so looking one up simply
+    matches nothing instead of raising.
+    """
+
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        try:
+            return super().process_bind_param(value, dialect)
+        except ValueError:
+            return None
+
+
+# JSON schema for User payloads. The *_SCHEMA dicts are built once and
+# returned as-is by get_schema(), so they must be treated as read-only.
+USER_SCHEMA = {
+    "type": "object",
+    "required": ["name", "email", "password_hash"],
+    "properties": {
+        "name": {"type": "string"},
+        "email": {"type": "string", "format": "email"},
+        "password_hash": {"type": "string"},
+    },
+}
 
 
 class User(db.Model):
@@ -38,27 +228,36 @@ class User(db.Model):
     __tablename__ = "users"
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    uuid = db.Column(db.String(36), unique=True, default=get_uuid)
+    uuid = db.Column(UUIDString(), unique=True, default=get_uuid)
     name = db.Column(db.String(255), nullable=False)
     email = db.Column(db.String(255), nullable=False, unique=True)
-    password_hash = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime(timezone=True), default=get_current_time)
+    # Only needed to verify credentials, so it is not loaded with the user
+    password_hash = db.deferred(db.Column(db.Text, nullable=False))
+    created_at = db.Column(
+        db.DateTime(timezone=True), nullable=False, server_default=db.func.now()
+    )
     updated_at = db.Column(
-        db.DateTime(timezone=True), default=get_current_time, onupdate=get_current_time
+        db.DateTime(timezone=True),
+        nullable=False,
+        server_default=db.func.now(),
+        onupdate=db.func.now(),
     )
 
     # Relationships
     created_groups = db.relationship(
-        "Group", backref="creator", lazy=True, cascade="all, delete-orphan"
+        "Group", back_populates="creator", lazy=True, cascade="all, delete-orphan"
     )
     group_memberships = db.relationship(
-        "GroupMember", backref="user", lazy=True, cascade="all, delete-orphan"
+        "GroupMember", back_populates="user", lazy=True, cascade="all, delete-orphan"
     )
     created_expenses = db.relationship(
-        "Expense", backref="creator", lazy=True, cascade="all, delete-orphan"
+        "Expense", back_populates="creator", lazy=True, cascade="all, delete-orphan"
     )
     expense_participations = db.relationship(
-        "ExpenseParticipant", backref="user", lazy=True, cascade="all, delete-orphan"
+        "ExpenseParticipant", back_populates="user", lazy=True, cascade="all, delete-orphan"
+    )
+    api_keys = db.relationship(
+        "ApiKey", back_populates="user", lazy=True, cascade="all, delete-orphan"
     )
 
     def serialize(self, short_form=False):
@@ -71,21 +270,31 @@ class User(db.Model):
         Returns:
             dict: Serialized user data.
         """
-        data = {
+        return self.serialize_short() if short_form else self.serialize_full()
+
+    def serialize_short(self):
+        """Serialize the basic User fields."""
+        return {
             "id": self.uuid,
             "name": self.name,
             "email": self.email,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
         }
 
-        if not short_form:
-            data["created_groups"] = [group.uuid for group in self.created_groups]
-            data["group_memberships"] = [
+    def serialize_full(self):
+        """Serialize the User with the groups it created and belongs to."""
+        return {
+            "id": self.uuid,
+            "name": self.name,
+            "email": self.email,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "created_groups": [group.uuid for group in self.created_groups],
+            "group_memberships": [
                 membership.group.uuid for membership in self.group_memberships
-            ]
-
-        return data
+            ],
+        }
 
     def deserialize(self, data):
         """
@@ -109,15 +318,10 @@ class User(db.Model):
         Returns:
             dict: JSON schema for user data validation.
         """
-        return {
-            "type": "object",
-            "required": ["name", "email", "password_hash"],
-            "properties": {
-                "name": {"type": "string"},
-                "email": {"type": "string", "format": "email"},
-                "password_hash": {"type": "string"},
-            },
-        }
+        return USER_SCHEMA
+
+
+User.validate = staticmethod(compile_validator(User.get_schema()))
 
 
 class ApiKey(db.Model):
@@ -128,43 +332,43 @@ class ApiKey(db.Model):
     """
 
     __tablename__ = "api_keys"
+    __table_args__ = (db.Index("ix_apikey_user", "user_id"),)
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    uuid = db.Column(db.String(36), unique=True, default=get_uuid)
-    key_hash = db.Column(db.String(64), nullable=False, unique=True)
+    uuid = db.Column(UUIDString(), unique=True, default=get_uuid)
+    key_hash = db.Column(db.String(64), nullable=False, unique=True, index=True)
     user_id = db.Column(
         db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
-    created_at = db.Column(db.DateTime(timezone=True), default=get_current_time)
+    created_at = db.Column(
+        db.DateTime(timezone=True), nullable=False, server_default=db.func.now()
+    )
 
     # Relationship
-    user = db.relationship(
-        "User",
-        backref=db.backref("api_keys", lazy=True, cascade="all, delete-orphan"),
-        cascade="all, delete",
-    )
+    user = db.relationship("User", back_populates="api_keys", cascade="all, delete")
 
     def serialize(self, short_form=False):
         """
         Serialize ApiKey object to dictionary.
-        
+
         Args:
             short_form (bool): Whether to include only basic information.
-            
+
         Returns:
             dict: Serialized API key data.
         """
-        data = {
+        return self.serialize_short() if short_form else self.serialize_full()
+
+    def serialize_short(self):
+        """Serialize the ApiKey fields."""
+        return {
             "id": self.uuid,
             "user_id": self.user.uuid,
-            "created_at": self.created_at.isoformat() if self.created_at else None
+            "created_at": self.created_at,
         }
-        
-        if not short_form:
-            # Add additional fields for detailed view if needed
-            pass
-            
-        return data
+
+    # API keys have no additional detail fields
+    serialize_full = serialize_short
 
     @staticmethod
     def get_hash(key):
@@ -177,7 +381,15 @@ class ApiKey(db.Model):
         Returns:
             str: SHA-256 hash of the API key.
         """
-        return hashlib.sha256(key.encode()).hexdigest()
+        return _sha256(key.encode()).hexdigest()
+
+
+# JSON schema for Group payloads
+GROUP_SCHEMA = {
+    "type": "object",
+    "required": ["name"],
+    "properties": {"name": {"type": "string"}},
+}
 
 
 class Group(db.Model):
@@ -188,25 +400,32 @@ class Group(db.Model):
     """
 
     __tablename__ = "groups"
+    __table_args__ = (db.Index("ix_group_creator", "created_by"),)
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    uuid = db.Column(db.String(36), unique=True, default=get_uuid)
+    uuid = db.Column(UUIDString(), unique=True, default=get_uuid)
     name = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
     created_by = db.Column(
         db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
-    created_at = db.Column(db.DateTime(timezone=True), default=get_current_time)
+    created_at = db.Column(
+        db.DateTime(timezone=True), nullable=False, server_default=db.func.now()
+    )
     updated_at = db.Column(
-        db.DateTime(timezone=True), default=get_current_time, onupdate=get_current_time
+        db.DateTime(timezone=True),
+        nullable=False,
+        server_default=db.func.now(),
+        onupdate=db.func.now(),
     )
 
     # Relationships
+    creator = db.relationship("User", back_populates="created_groups", lazy="joined")
     members = db.relationship(
-        "GroupMember", backref="group", lazy=True, cascade="all, delete-orphan"
+        "GroupMember", back_populates="group", lazy=True, cascade="all, delete-orphan"
     )
     expenses = db.relationship(
-        "Expense", backref="group", lazy=True, cascade="all, delete-orphan"
+        "Expense", back_populates="group", lazy=True, cascade="all, delete-orphan"
     )
 
     def serialize(self, short_form=False):
@@ -219,22 +438,31 @@ class Group(db.Model):
         Returns:
             dict: Serialized group data.
         """
-        data = {
+        return self.serialize_short() if short_form else self.serialize_full()
+
+    def serialize_short(self):
+        """Serialize the basic Group fields."""
+        return {
             "id": self.uuid,
             "name": self.name,
             "description": self.description,
             "created_by": self.creator.uuid,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
         }
 
-        if not short_form:
-            data["members"] = [
-                member.serialize(short_form=True) for member in self.members
-            ]
-            data["expenses"] = [expense.uuid for expense in self.expenses]
-
-        return data
+    def serialize_full(self):
+        """Serialize the Group with its members and expense IDs."""
+        return {
+            "id": self.uuid,
+            "name": self.name,
+            "description": self.description,
+            "created_by": self.creator.uuid,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "members": list(map(GroupMember.serialize_short, self.members)),
+            "expenses": [expense.uuid for expense in self.expenses],
+        }
 
     def deserialize(self, data):
         """
@@ -256,11 +484,10 @@ class Group(db.Model):
         Returns:
             dict: JSON schema for group data validation.
         """
-        return {
-            "type": "object",
-            "required": ["name"],
-            "properties": {"name": {"type": "string"}},
-        }
+        return GROUP_SCHEMA
+
+
+Group.validate = staticmethod(compile_validator(Group.get_schema()))
 
 
 class GroupMember(db.Model):
@@ -271,9 +498,16 @@ class GroupMember(db.Model):
     """
 
     __tablename__ = "group_members"
+    # Membership and role checks look up (user_id, group_id); a user can only
+    # join a group once, so the index doubles as a uniqueness guarantee.
+    # The group-leading index serves member listings and admin counts.
+    __table_args__ = (
+        db.Index("ix_gm_user_group", "user_id", "group_id", unique=True),
+        db.Index("ix_gm_group_user", "group_id", "user_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    uuid = db.Column(db.String(36), unique=True, default=get_uuid)
+    uuid = db.Column(UUIDString(), unique=True, default=get_uuid)
     user_id = db.Column(
         db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
@@ -281,31 +515,47 @@ class GroupMember(db.Model):
         db.Integer, db.ForeignKey("groups.id", ondelete="CASCADE"), nullable=False
     )
     role = db.Column(db.String(50), default="member")
-    joined_at = db.Column(db.DateTime(timezone=True), default=get_current_time)
+    joined_at = db.Column(
+        db.DateTime(timezone=True), nullable=False, server_default=db.func.now()
+    )
+
+    # Relationships
+    user = db.relationship("User", back_populates="group_memberships", lazy="joined")
+    group = db.relationship("Group", back_populates="members")
 
     def serialize(self, short_form=False):
         """
         Serialize GroupMember object to dictionary.
-        
+
         Args:
             short_form (bool): Whether to include only basic information.
-            
+
         Returns:
             dict: Serialized group member data.
         """
-        data = {
+        return self.serialize_short() if short_form else self.serialize_full()
+
+    def serialize_short(self):
+        """Serialize the basic GroupMember fields."""
+        return {
             "id": self.uuid,
             "user_id": self.user.uuid,
             "group_id": self.group.uuid,
             "role": self.role,
-            "joined_at": self.joined_at.isoformat() if self.joined_at else None,
+            "joined_at": self.joined_at,
+        }
+
+    def serialize_full(self):
+        """Serialize the GroupMember with the user name for convenience."""
+        user = self.user
+        return {
+            "id": self.uuid,
+            "user_id": user.uuid,
+            "group_id": self.group.uuid,
+            "role": self.role,
+            "joined_at": self.joined_at,
+            "user_name": user.name,
         }
-        
-        if not short_form:
-            # Add user name for convenience in the detailed view
-            data["user_name"] = self.user.name
-            
-        return data
 
     def deserialize(self, data):
         """
@@ -318,6 +568,17 @@ class GroupMember(db.Model):
             self.role = data["role"]
 
 
+# JSON schema for Expense payloads
+EXPENSE_SCHEMA = {
+    "type": "object",
+    "required": ["amount", "description"],
+    "properties": {
+        "amount": {"type": "number", "minimum": 0},
+        "description": {"type": "string"},
+    },
+}
+
+
 class Expense(db.Model):
     """
     Expense model representing a shared expense within a group.
@@ -326,32 +587,59 @@ class Expense(db.Model):
     """
 
     __tablename__ = "expenses"
+    # Expenses are listed per group; the creator index backs user deletes.
+    __table_args__ = (
+        db.Index("ix_expense_group_created", "group_id", "created_at"),
+        db.Index("ix_expense_creator", "created_by"),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    uuid = db.Column(db.String(36), unique=True, default=get_uuid)
+    uuid = db.Column(UUIDString(), unique=True, default=get_uuid)
     group_id = db.Column(
         db.Integer, db.ForeignKey("groups.id", ondelete="CASCADE"), nullable=False
     )
+    # Copy of the group's (immutable) UUID, filled in on insert, so responses
+    # and cache scopes never have to load the group
+    group_uuid = db.Column(UUIDString(), nullable=False)
     created_by = db.Column(
         db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
-    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    amount_cents = db.Column(db.BigInteger, nullable=False)
     description = db.Column(db.Text, nullable=False)
     category = db.Column(db.String(100))
-    created_at = db.Column(db.DateTime(timezone=True), default=get_current_time)
+    created_at = db.Column(
+        db.DateTime(timezone=True), nullable=False, server_default=db.func.now()
+    )
     updated_at = db.Column(
-        db.DateTime(timezone=True), default=get_current_time, onupdate=get_current_time
+        db.DateTime(timezone=True),
+        nullable=False,
+        server_default=db.func.now(),
+        onupdate=db.func.now(),
     )
 
     # Relationships
+    group = db.relationship("Group", back_populates="expenses")
+    creator = db.relationship("User", back_populates="created_expenses", lazy="joined")
     participants = db.relationship(
-        "ExpenseParticipant", backref="expense", lazy=True, cascade="all, delete-orphan"
+        "ExpenseParticipant",
+        back_populates="expense",
+        lazy="selectin",
+        cascade="all, delete-orphan",
     )
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        if self.amount is not None:
-            self.amount = float(self.amount)
+    @hybrid_property
+    def amount(self):
+        """Expense amount in currency units, stored as integer cents."""
+        return from_cents(self.amount_cents)
+
+    @amount.setter
+    def amount(self, value):
+        self.amount_cents = to_cents(value)
+
+    @amount.expression
+    def amount(cls):  # pylint: disable=no-self-argument
+        """Expense amount in currency units as a SQL expression."""
+        return cls.amount_cents / 100.0
 
     def serialize(self, short_form=False):
         """
@@ -363,24 +651,36 @@ class Expense(db.Model):
         Returns:
             dict: Serialized expense data.
         """
-        data = {
+        return self.serialize_short() if short_form else self.serialize_full()
+
+    def serialize_short(self):
+        """Serialize the basic Expense fields."""
+        return {
             "id": self.uuid,
-            "group_id": self.group.uuid,
+            "group_id": self.group_uuid,
             "created_by": self.creator.uuid,
-            "amount": float(self.amount) if self.amount is not None else None,
+            "amount": self.amount,
             "description": self.description,
             "category": self.category,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
         }
 
-        if not short_form:
-            data["participants"] = [
-                participant.serialize(short_form=True)
-                for participant in self.participants
-            ]
-
-        return data
+    def serialize_full(self):
+        """Serialize the Expense with its participants."""
+        return {
+            "id": self.uuid,
+            "group_id": self.group_uuid,
+            "created_by": self.creator.uuid,
+            "amount": self.amount,
+            "description": self.description,
+            "category": self.category,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "participants": list(
+                map(ExpenseParticipant.serialize_short, self.participants)
+            ),
+        }
 
     def deserialize(self, data):
         """
@@ -390,7 +690,7 @@ class Expense(db.Model):
             data (dict): Dictionary containing expense data to update.
         """
         if "amount" in data:
-            self.amount = float(data["amount"])
+            self.amount = data["amount"]
         if "description" in data:
             self.description = data["description"]
         if "category" in data:
@@ -404,14 +704,30 @@ class Expense(db.Model):
         Returns:
             dict: JSON schema for expense data validation.
         """
-        return {
-            "type": "object",
-            "required": ["amount", "description"],
-            "properties": {
-                "amount": {"type": "number", "minimum": 0},
-                "description": {"type": "string"},
-            },
-        }
+        return EXPENSE_SCHEMA
+
+
+Expense.validate = staticmethod(compile_validator(Expense.get_schema()))
+
+
+@event.listens_for(Expense, "before_insert")
+def fill_group_uuid(mapper, connection, target):  # pylint: disable=unused-argument
+    """Copy the owning group's UUID onto a new expense if it was not given."""
+    if target.group_uuid is None:
+        target.group_uuid = connection.execute(
+            select(Group.uuid).where(Group.id == target.group_id)
+        ).scalar_one()
+
+
+# JSON schema for ExpenseParticipant payloads
+EXPENSE_PARTICIPANT_SCHEMA = {
+    "type": "object",
+    "required": ["user_id", "share"],
+    "properties": {
+        "user_id": {"type": "string"},
+        "share": {"type": "number", "minimum": 0},
+    },
+}
 
 
 class ExpenseParticipant(db.Model):
@@ -422,50 +738,102 @@ class ExpenseParticipant(db.Model):
     """
 
     __tablename__ = "expense_participants"
+    __table_args__ = (
+        db.Index("ix_ep_expense_user", "expense_id", "user_id"),
+        db.Index("ix_ep_user", "user_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    uuid = db.Column(db.String(36), unique=True, default=get_uuid)
+    uuid = db.Column(UUIDString(), unique=True, default=get_uuid)
     expense_id = db.Column(
         db.Integer, db.ForeignKey("expenses.id", ondelete="CASCADE"), nullable=False
     )
     user_id = db.Column(
         db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
-    share = db.Column(db.Numeric(10, 2), nullable=False)
-    paid = db.Column(db.Numeric(10, 2), default=0)
+    share_cents = db.Column(db.BigInteger, nullable=False)
+    paid_cents = db.Column(db.BigInteger, default=0)
+    # Maintained by the database, so reads and sums need no arithmetic
+    balance_cents = db.Column(
+        db.BigInteger, db.Computed("paid_cents - share_cents", persisted=True)
+    )
 
-    def __init__(self, *args, **kwargs):
-        """Initialize ExpenseParticipant with type conversion for numeric values."""
-        super().__init__(*args, **kwargs)
-        if self.share is not None:
-            self.share = float(self.share)
-        if self.paid is not None:
-            self.paid = float(self.paid)
+    # Relationships
+    expense = db.relationship("Expense", back_populates="participants")
+    user = db.relationship("User", back_populates="expense_participations", lazy="joined")
+
+    @hybrid_property
+    def share(self):
+        """Participant's share in currency units, stored as integer cents."""
+        return from_cents(self.share_cents)
+
+    @share.setter
+    def share(self, value):
+        self.share_cents = to_cents(value)
+
+    @share.expression
+    def share(cls):  # pylint: disable=no-self-argument
+        """Participant's share in currency units as a SQL expression."""
+        return cls.share_cents / 100.0
+
+    @hybrid_property
+    def paid(self):
+        """Amount the participant paid in currency units, stored as integer cents."""
+        return from_cents(self.paid_cents)
+
+    @paid.setter
+    def paid(self, value):
+        self.paid_cents = to_cents(value)
+
+    @paid.expression
+    def paid(cls):  # pylint: disable=no-self-argument
+        """Amount paid in currency units as a SQL expression."""
+        return cls.paid_cents / 100.0
+
+    @hybrid_property
+    def balance(self):
+        """Amount paid minus the share in currency units, computed by the database."""
+        return from_cents(self.balance_cents)
+
+    @balance.expression
+    def balance(cls):  # pylint: disable=no-self-argument
+        """Paid minus share in currency units as a SQL expression."""
+        return cls.balance_cents / 100.0
 
     def serialize(self, short_form=False):
         """
         Serialize ExpenseParticipant object to dictionary.
-        
+
         Args:
             short_form (bool): Whether to include only basic information.
-            
+
         Returns:
             dict: Serialized expense participant data.
         """
-        data = {
+        return self.serialize_short() if short_form else self.serialize_full()
+
+    def serialize_short(self):
+        """Serialize the basic ExpenseParticipant fields."""
+        return {
             "id": self.uuid,
             "expense_id": self.expense.uuid,
             "user_id": self.user.uuid,
-            "share": float(self.share) if self.share is not None else None,
-            "paid": float(self.paid) if self.paid is not None else None,
+            "share": self.share,
+            "paid": self.paid,
+        }
+
+    def serialize_full(self):
+        """Serialize the ExpenseParticipant with user name and balance."""
+        user = self.user
+        return {
+            "id": self.uuid,
+            "expense_id": self.expense.uuid,
+            "user_id": user.uuid,
+            "share": self.share,
+            "paid": self.paid,
+            "user_name": user.name,
+            "balance": self.balance,
         }
-        
-        if not short_form:
-            # Add user name and balance information for a more detailed view
-            data["user_name"] = self.user.name
-            data["balance"] = float(self.paid) - float(self.share) if (self.paid is not None and self.share is not None) else None
-            
-        return data
 
     def deserialize(self, data):
         """
@@ -475,9 +843,9 @@ class ExpenseParticipant(db.Model):
             data (dict): Dictionary containing expense participant data to update.
         """
         if "share" in data:
-            self.share = float(data["share"])
+            self.share = data["share"]
         if "paid" in data:
-            self.paid = float(data["paid"])
+            self.paid = data["paid"]
 
     @staticmethod
     def get_schema():
@@ -487,20 +855,65 @@ class ExpenseParticipant(db.Model):
         Returns:
             dict: JSON schema for expense participant data validation.
         """
-        return {
-            "type": "object",
-            "required": ["user_id", "share"],
-            "properties": {
-                "user_id": {"type": "string"},
-                "share": {"type": "number", "minimum": 0},
-            },
+        return EXPENSE_PARTICIPANT_SCHEMA
+
+
+ExpenseParticipant.validate = staticmethod(
+    compile_validator(ExpenseParticipant.get_schema())
+)
+
+
+def schema_problems():
+    """
+    Compare the tables already in the database with the models.
+
+    ``db.create_all()`` only creates missing tables and never alters existing
+    ones, so a database created by an older version keeps its old columns
+    (text UUIDs, decimal amounts instead of cents, no ``group_uuid``) and
+    would fail at runtime.
+
+    Returns:
+        list: A description of each difference, empty if the schema is current
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    problems = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {
+            column["name"]: column["type"] for column in inspector.get_columns(table.name)
         }
+        missing = [column.name for column in table.columns if column.name not in existing]
+        if missing:
+            problems.append(f"{table.name} has no {', '.join(missing)} column(s)")
+        for column in table.columns:
+            if isinstance(column.type, UUIDString) and isinstance(
+                existing.get(column.name), String
+            ):
+                problems.append(f"{table.name}.{column.name} stores UUIDs as text")
+    return problems
 
 
 @click.command("init-db")
+@click.option(
+    "--drop", is_flag=True, help="Drop the existing tables first, deleting all data."
+)
 @with_appcontext
-def init_db_command():
+def init_db_command(drop):
     """Initialize the database with required tables."""
+    if drop:
+        db.drop_all()
+
+    problems = schema_problems()
+    if problems:
+        raise click.ClickException(
+            "The database was created by an older version of the application "
+            "and cannot be upgraded in place: "
+            + "; ".join(problems)
+            + ". Back up the data, then rebuild the schema with "
+            "'flask init-db --drop'."
+        )
     db.create_all()
 
 
@@ -509,72 +922,73 @@ def init_db_command():
 def generate_test_data():
     """Generate test data for the expense tracker application."""
     try:
-        # Create users
+        # Create users; sample passwords use a cheap hash, as they only seed
+        # a development database
         users = [
             User(
-                name="John Doe",
-                email="john@example.com",
-                password_hash=generate_password_hash("password123"),
-            ),
-            User(
-                name="Jane Smith",
-                email="jane@example.com",
-                password_hash=generate_password_hash("password456"),
-            ),
-            User(
-                name="Bob Wilson",
-                email="bob@example.com",
-                password_hash=generate_password_hash("password789"),
-            ),
+                name=name,
+                email=email,
+                password_hash=generate_password_hash(
+                    password, method=TEST_DATA_PASSWORD_METHOD
+                ),
+            )
+            for name, email, password in (
+                ("John Doe", "john@example.com", "password123"),
+                ("Jane Smith", "jane@example.com", "password456"),
+                ("Bob Wilson", "bob@example.com", "password789"),
+            )
         ]
-
-        for user in users:
-            db.session.add(user)
-        db.session.commit()
+        db.session.add_all(users)
+        db.session.flush()
 
         # Create a group
         group = Group(
             name="Roommates", description="Apartment expenses", created_by=users[0].id
         )
         db.session.add(group)
-        db.session.commit()
-
-        # Add members to the group
-        members = [GroupMember(user_id=user.id, group_id=group.id) for user in users]
-        # Make the first user an admin
-        members[0].role = "admin"
-
-        for member in members:
-            db.session.add(member)
-        db.session.commit()
+        db.session.flush()
+
+        # Add members to the group, making the first user an admin
+        db.session.execute(
+            insert(GroupMember),
+            [
+                {
+                    "user_id": user.id,
+                    "group_id": group.id,
+                    "role": "admin" if index == 0 else "member",
+                }
+                for index, user in enumerate(users)
+            ],
+        )
 
         # Create an expense
         expense = Expense(
             group_id=group.id,
+            group_uuid=group.uuid,
             created_by=users[0].id,
-            amount=150.00,
+            amount=150,
             description="Groceries",
             category="Food",
         )
         db.session.add(expense)
-        db.session.commit()
+        db.session.flush()
 
         # Add expense participants
-        participants = [
-            ExpenseParticipant(
-                expense_id=expense.id, user_id=users[0].id, share=50.00, paid=150.00
-            ),
-            ExpenseParticipant(
-                expense_id=expense.id, user_id=users[1].id, share=50.00, paid=0.00
-            ),
-            ExpenseParticipant(
-                expense_id=expense.id, user_id=users[2].id, share=50.00, paid=0.00
-            ),
-        ]
-        for participant in participants:
-            db.session.add(participant)
-        db.session.commit()
+        db.session.execute(
+            insert(ExpenseParticipant),
+            [
+                {
+                    "expense_id": expense.id,
+                    "user_id": user.id,
+                    "share_cents": to_cents(50),
+                    "paid_cents": to_cents(150) if index == 0 else 0,
+                }
+                for index, user in enumerate(users)
+            ],
+        )
 
+        db.session.commit()
         click.echo("Test data generated successfully!")
     except Exception as e:  # pylint: disable=broad-exception-caught
+        db.session.rollback()
         click.echo(f"Error generating test data: {str(e)}", err=True)
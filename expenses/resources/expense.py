@@ -1,110 +1,316 @@
 """Expense resources module for the expenses API."""
 
+from collections import defaultdict
+
 from flask import request, g
 from flask_restful import Resource
-from jsonschema import validate, ValidationError
+from sqlalchemy import and_, bindparam, delete, insert, select, update
+from jsonschema import ValidationError
 from werkzeug.exceptions import BadRequest, UnsupportedMediaType, Forbidden
 
-from expenses import cache
-from expenses.models import db, User, GroupMember, Expense, ExpenseParticipant
-from expenses.utils import require_api_key, MasonBuilder
+from expenses.models import (
+    db,
+    User,
+    GroupMember,
+    Expense,
+    ExpenseParticipant,
+    EXPENSE_SCHEMA,
+    EXPENSE_PARTICIPANT_SCHEMA,
+    to_cents,
+    from_cents,
+)
+from expenses.utils import (
+    require_api_key,
+    get_member_role,
+    is_group_member,
+    mark_stale,
+    revision_scopes,
+    revision_cached,
+    MasonBuilder,
+)
+
+
+# Columns needed for the expense listing, with the creator's UUID joined in;
+# list rows are built straight from these tuples instead of ORM objects.
+EXPENSE_LIST_QUERY = select(
+    Expense.id,
+    Expense.uuid,
+    Expense.group_id,
+    User.uuid.label("creator_uuid"),
+    Expense.amount_cents,
+    Expense.description,
+    Expense.category,
+    Expense.created_at,
+    Expense.updated_at,
+).join(User, Expense.created_by == User.id)
+
+# Short-form participant columns for every expense in a group.
+PARTICIPANT_LIST_QUERY = (
+    select(
+        ExpenseParticipant.uuid,
+        ExpenseParticipant.expense_id,
+        Expense.uuid.label("expense_uuid"),
+        User.uuid.label("user_uuid"),
+        ExpenseParticipant.share_cents,
+        ExpenseParticipant.paid_cents,
+    )
+    .join(Expense, ExpenseParticipant.expense_id == Expense.id)
+    .join(User, ExpenseParticipant.user_id == User.id)
+)
 
 
 def build_expense_controls(expense):
+    href = f"/expenses/{expense.id}"
     return {
-        "self": {"href": f"/expenses/{expense.id}"},
+        "self": {"href": href},
         "update": {
-            "href": f"/expenses/{expense.id}",
+            "href": href,
             "method": "PUT",
             "encoding": "json",
-            "schema": Expense.get_schema()
+            "schema": EXPENSE_SCHEMA
         },
-        "delete": {"href": f"/expenses/{expense.id}", "method": "DELETE"},
-        "participants": {"href": f"/expenses/{expense.id}/participants/", "method": "GET"},
+        "delete": {"href": href, "method": "DELETE"},
+        "participants": {"href": href + "/participants/", "method": "GET"},
         "group": {"href": f"/groups/{expense.group_id}", "method": "GET"}
     }
 
 
+# Largest allowed difference between the participant shares and the amount, in cents
+SHARE_TOLERANCE_CENTS = 1
+
+
+def build_participants(expense, group_id, participants_data):
+    """
+    Validate participant payloads and build their expense_participants rows.
+
+    All referenced users and their memberships in the group are resolved
+    with a single IN query, rather than two lookups per participant.
+
+    Args:
+        expense: The expense the participants belong to
+        group_id: ID of the group participants must be members of
+        participants_data: List of participant dicts from the request
+
+    Returns:
+        tuple: (list of row dicts for insert_participants, total share in cents)
+
+    Raises:
+        BadRequest: If a user does not exist or is not a group member
+    """
+    uuids = [participant_data["user_id"] for participant_data in participants_data]
+    # uuid -> (user id, whether the user is a member of the group)
+    users = {
+        row.uuid: (row.id, row.is_member)
+        for row in db.session.execute(
+            select(User.uuid, User.id, (GroupMember.id.isnot(None)).label("is_member"))
+            .outerjoin(
+                GroupMember,
+                and_(GroupMember.user_id == User.id, GroupMember.group_id == group_id),
+            )
+            .where(User.uuid.in_(uuids))
+        )
+    }
+
+    rows = []
+    total_share = 0
+    for participant_data in participants_data:
+        user_uuid = participant_data["user_id"]
+        if user_uuid not in users:
+            db.session.rollback()
+            raise BadRequest(f"User {user_uuid} does not exist")
+
+        user_id, is_member = users[user_uuid]
+        if not is_member:
+            db.session.rollback()
+            raise BadRequest(f"User {user_uuid} is not a member of this group")
+
+        share_cents = to_cents(participant_data["share"])
+        rows.append(
+            {
+                "expense_id": expense.id,
+                "user_id": user_id,
+                "share_cents": share_cents,
+                "paid_cents": to_cents(participant_data.get("paid", 0)),
+            }
+        )
+        total_share += share_cents
+
+    return rows, total_share
+
+
+def insert_participants(rows):
+    """
+    Insert participant rows with a single executemany INSERT.
+
+    Args:
+        rows: Row dicts produced by build_participants
+    """
+    if rows:
+        db.session.execute(insert(ExpenseParticipant), rows)
+
+
+def replace_participants(expense, rows):
+    """
+    Make an expense's participants match the given rows with minimal writes.
+
+    Incoming rows are paired with the already loaded participants of the
+    same user. Pairs whose amounts are unchanged are left alone, changed
+    pairs are updated in one executemany UPDATE, and only the leftovers on
+    either side are deleted or inserted.
+
+    Args:
+        expense: The expense whose participants are replaced
+        rows: Row dicts produced by build_participants
+
+    Returns:
+        bool: True if any participant row was written
+    """
+    existing = defaultdict(list)
+    for participant in expense.participants:
+        existing[participant.user_id].append(participant)
+
+    inserts, updates = [], []
+    for row in rows:
+        matches = existing.get(row["user_id"])
+        if not matches:
+            inserts.append(row)
+            continue
+        current = matches.pop()
+        if (current.share_cents, current.paid_cents) != (
+            row["share_cents"],
+            row["paid_cents"],
+        ):
+            updates.append(
+                {
+                    "participant_id": current.id,
+                    "new_share_cents": row["share_cents"],
+                    "new_paid_cents": row["paid_cents"],
+                }
+            )
+    stale_ids = [
+        participant.id for matches in existing.values() for participant in matches
+    ]
+
+    table = ExpenseParticipant.__table__
+    if stale_ids:
+        db.session.execute(delete(table).where(table.c.id.in_(stale_ids)))
+    if updates:
+        db.session.execute(
+            update(table)
+            .where(table.c.id == bindparam("participant_id"))
+            .values(
+                share_cents=bindparam("new_share_cents"),
+                paid_cents=bindparam("new_paid_cents"),
+            ),
+            updates,
+        )
+    insert_participants(inserts)
+
+    return bool(stale_ids or updates or inserts)
+
+
+def check_share_total(expense, total_share):
+    """
+    Ensure participant shares add up to the expense amount.
+
+    Both sides are integer cents, so float rounding in the running total can
+    never reject a valid split.
+
+    Args:
+        expense: The expense being created or updated
+        total_share: Sum of participant shares in cents
+
+    Raises:
+        BadRequest: If the total differs from the amount by more than a cent
+    """
+    if abs(total_share - expense.amount_cents) > SHARE_TOLERANCE_CENTS:
+        db.session.rollback()
+        raise BadRequest(
+            f"Total participant shares ({from_cents(total_share)}) "
+            f"must equal expense amount ({expense.amount})"
+        )
+
+
 class ExpenseCollection(Resource):
     """Resource for collection of Expense objects in a group"""
 
+    @revision_cached("groups/{group.uuid}/expenses")
     def get(self, group):
         """Get all expenses in a group"""
-        expenses = Expense.query.filter_by(group_id=group.id).all()
+        rows = db.session.execute(
+            EXPENSE_LIST_QUERY.where(Expense.group_id == group.id)
+        ).all()
+        participants = defaultdict(list)
+        for row in db.session.execute(
+            PARTICIPANT_LIST_QUERY.where(Expense.group_id == group.id)
+        ):
+            participants[row.expense_id].append(
+                {
+                    "id": row.uuid,
+                    "expense_id": row.expense_uuid,
+                    "user_id": row.user_uuid,
+                    "share": from_cents(row.share_cents),
+                    "paid": from_cents(row.paid_cents),
+                }
+            )
+
         res = MasonBuilder()
         res["expenses"] = []
 
-        for expense in expenses:
-            e_doc = MasonBuilder(**expense.serialize())
-            for name, props in build_expense_controls(expense).items():
-                e_doc.add_control(name, **props)
+        for row in rows:
+            e_doc = MasonBuilder(
+                id=row.uuid,
+                group_id=group.uuid,
+                created_by=row.creator_uuid,
+                amount=from_cents(row.amount_cents),
+                description=row.description,
+                category=row.category,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+                participants=participants[row.id],
+            )
+            # The controls are built fresh per row, so attach them as-is
+            e_doc["@controls"] = build_expense_controls(row)
             res["expenses"].append(e_doc)
 
         res.add_control("self", f"/groups/{group.uuid}/expenses/")
-        res.add_control("create", f"/groups/{group.uuid}/expenses/", method="POST", encoding="json", schema=Expense.get_schema())
+        res.add_control("create", f"/groups/{group.uuid}/expenses/", method="POST", encoding="json", schema=EXPENSE_SCHEMA)
         return res, 200
 
     @require_api_key
     def post(self, group):
         # g.user_id = 1
         """Create a new expense in a group"""
-        member = GroupMember.query.filter_by(user_id=g.user_id, group_id=group.id).first()
-        if not member:
+        if not is_group_member(g.user_id, group.id):
             raise Forbidden("Only group members can create expenses")
 
-        if not request.json:
+        data = request.json
+        if not data:
             raise UnsupportedMediaType("Request must be JSON")
 
         try:
-            validate(instance=request.json, schema=Expense.get_schema())
+            Expense.validate(data)
         except ValidationError as e:
             raise BadRequest(f"Validation error: {e.message}") from e
 
-        expense = Expense(created_by=g.user_id, group_id=group.id)
-        expense.deserialize(request.json)
+        expense = Expense(created_by=g.user_id, group_id=group.id, group_uuid=group.uuid)
+        expense.deserialize(data)
 
         db.session.add(expense)
         db.session.flush()
 
-        if "participants" in request.json:
-            total_share = 0
-            for participant_data in request.json["participants"]:
-                user_uuid = participant_data["user_id"]
-                participant_user = User.query.filter_by(uuid=user_uuid).first()
-                if not participant_user:
-                    db.session.rollback()
-                    raise BadRequest(f"User {user_uuid} does not exist")
-
-                participant_member = GroupMember.query.filter_by(
-                    user_id=participant_user.id, group_id=group.id).first()
-                if not participant_member:
-                    db.session.rollback()
-                    raise BadRequest(f"User {user_uuid} is not a member of this group")
-
-                participant = ExpenseParticipant(
-                    expense_id=expense.id,
-                    user_id=participant_user.id,
-                    share=participant_data["share"],
-                )
-
-                if "paid" in participant_data:
-                    participant.paid = participant_data["paid"]
-
-                total_share += float(participant.share)
-                db.session.add(participant)
-
-            if abs(total_share - float(expense.amount)) > 0.01:
-                db.session.rollback()
-                raise BadRequest(
-                    f"Total participant shares ({total_share}) must equal expense amount ({expense.amount})"
-                )
+        if "participants" in data:
+            rows, total_share = build_participants(
+                expense, group.id, data["participants"]
+            )
+            check_share_total(expense, total_share)
+
+            insert_participants(rows)
 
         db.session.commit()
-        cache.delete(f"groups/{group.uuid}/expenses")
 
         res = MasonBuilder(**expense.serialize())
-        for name, props in build_expense_controls(expense).items():
-            res.add_control(name, **props)
+        res["@controls"] = build_expense_controls(expense)
 
         return res, 201
 
@@ -112,12 +318,11 @@ class ExpenseCollection(Resource):
 class ExpenseItem(Resource):
     """Resource for individual Expense objects"""
 
-    @cache.cached(timeout=30)
+    @revision_cached("expenses/{expense.uuid}")
     def get(self, expense):
         """Get expense details"""
         res = MasonBuilder(**expense.serialize())
-        for name, props in build_expense_controls(expense).items():
-            res.add_control(name, **props)
+        res["@controls"] = build_expense_controls(expense)
         return res, 200
 
     @require_api_key
@@ -126,104 +331,70 @@ class ExpenseItem(Resource):
         if g.user_id != expense.created_by:
             raise Forbidden("Only the creator can update the expense")
 
-        if not request.json:
+        data = request.json
+        if not data:
             raise UnsupportedMediaType("Request must be JSON")
 
         try:
-            validate(instance=request.json, schema=Expense.get_schema())
+            Expense.validate(data)
         except ValidationError as e:
             raise BadRequest(f"Validation error: {e.message}") from e
 
-        expense.deserialize(request.json)
-
-        if "participants" in request.json:
-            ExpenseParticipant.query.filter_by(expense_id=expense.id).delete()
-
-            total_share = 0
-            for participant_data in request.json["participants"]:
-                try:
-                    validate(
-                        instance=participant_data,
-                        schema=ExpenseParticipant.get_schema(),
-                    )
-                except ValidationError as e:
-                    db.session.rollback()
-                    raise BadRequest(f"Participant validation error: {e.message}") from e
-
-                user_uuid = participant_data["user_id"]
-                participant_user = User.query.filter_by(uuid=user_uuid).first()
-                if not participant_user:
-                    db.session.rollback()
-                    raise BadRequest(f"User {user_uuid} does not exist")
-
-                participant_member = GroupMember.query.filter_by(
-                    user_id=participant_user.id, group_id=expense.group_id).first()
-                if not participant_member:
-                    db.session.rollback()
-                    raise BadRequest(f"User {user_uuid} is not a member of this group")
-
-                participant = ExpenseParticipant(
-                    expense_id=expense.id,
-                    user_id=participant_user.id,
-                    share=participant_data["share"],
-                )
-
-                if "paid" in participant_data:
-                    participant.paid = participant_data["paid"]
-
-                total_share += float(participant.share)
-                db.session.add(participant)
-
-            if abs(total_share - float(expense.amount)) > 0.01:
-                db.session.rollback()
-                raise BadRequest(
-                    f"Total participant shares ({total_share}) must equal expense amount ({expense.amount})"
-                )
+        # Reject bad participant payloads before anything is written
+        for participant_data in data.get("participants", ()):
+            try:
+                ExpenseParticipant.validate(participant_data)
+            except ValidationError as e:
+                raise BadRequest(f"Participant validation error: {e.message}") from e
+
+        expense.deserialize(data)
+
+        if "participants" in data:
+            rows, total_share = build_participants(
+                expense, expense.group_id, data["participants"]
+            )
+            check_share_total(expense, total_share)
+
+            if replace_participants(expense, rows):
+                # The bulk statements bypassed the loaded collection
+                db.session.expire(expense, ["participants"])
+                mark_stale(*revision_scopes(expense))
 
         db.session.commit()
-        cache.delete(f"expenses/{expense.uuid}")
-        cache.delete(f"groups/{expense.group.uuid}/expenses")
 
         res = MasonBuilder(**expense.serialize())
-        for name, props in build_expense_controls(expense).items():
-            res.add_control(name, **props)
+        res["@controls"] = build_expense_controls(expense)
         return res, 200
 
     @require_api_key
     def delete(self, expense):
         """Delete expense"""
         if g.user_id != expense.created_by:
-            admin_check = GroupMember.query.filter_by(
-                user_id=g.user_id, group_id=expense.group_id, role="admin").first()
-            if not admin_check:
+            if get_member_role(g.user_id, expense.group_id) != "admin":
                 raise Forbidden("Only the creator or group admin can delete the expense")
 
         db.session.delete(expense)
         db.session.commit()
 
-        cache.delete(f"expenses/{expense.uuid}")
-        cache.delete(f"groups/{expense.group.uuid}/expenses")
-
         return "", 204
 
 
 class ExpenseParticipantCollection(Resource):
     """Resource for collection of ExpenseParticipant objects in an expense"""
 
-    @cache.cached(timeout=30)
+    @revision_cached("expenses/{expense.uuid}")
     def get(self, expense):
         """Get all participants in an expense"""
-        participants = ExpenseParticipant.query.filter_by(expense_id=expense.id).all()
-
         res = MasonBuilder()
         res["participants"] = []
 
-        for participant in participants:
+        # Loaded with the expense itself (selectin, users joined in)
+        for participant in expense.participants:
             p_doc = MasonBuilder(**participant.serialize(short_form=True))
             p_doc.add_control("user", f"/users/{participant.user_id}", method="GET")
             res["participants"].append(p_doc)
 
         res.add_control("self", f"/expenses/{expense.id}/participants/")
-        res.add_control("add", f"/expenses/{expense.id}/participants/", method="POST", encoding="json", schema=ExpenseParticipant.get_schema())
+        res.add_control("add", f"/expenses/{expense.id}/participants/", method="POST", encoding="json", schema=EXPENSE_PARTICIPANT_SCHEMA)
 
         return res, 200
@@ -8,25 +8,45 @@ with appropriate permission checks for group administrators.
 
 from flask import request, g
 from flask_restful import Resource
-from jsonschema import validate, ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from jsonschema import ValidationError
 from werkzeug.exceptions import BadRequest, UnsupportedMediaType, Forbidden
-from expenses import cache
-from expenses.utils import require_api_key, MasonBuilder  # ⬅️ Replaced make_links with MasonBuilder
-from expenses.models import db, Group, GroupMember
+from expenses.utils import (
+    require_api_key,
+    get_member_role,
+    revision_cached,
+    MasonBuilder,
+)
+from expenses.models import db, User, Group, GroupMember, GROUP_SCHEMA
+
+
+# Columns needed for the short-form group listing; the creator's UUID is
+# joined in so the listing never lazy-loads Group.creator.
+GROUP_LIST_QUERY = select(
+    Group.id,
+    Group.uuid,
+    Group.name,
+    Group.description,
+    User.uuid.label("creator_uuid"),
+    Group.created_at,
+    Group.updated_at,
+).join(User, Group.created_by == User.id)
 
 
 def build_group_controls(group_id):
+    href = f"/groups/{group_id}"
     return {
-        "self": {"href": f"/groups/{group_id}"},
+        "self": {"href": href},
         "update": {
-            "href": f"/groups/{group_id}",
+            "href": href,
             "method": "PUT",
             "encoding": "json",
-            "schema": Group.get_schema()
+            "schema": GROUP_SCHEMA
         },
-        "delete": {"href": f"/groups/{group_id}", "method": "DELETE"},
-        "members": {"href": f"/groups/{group_id}/members/", "method": "GET"},
-        "expenses": {"href": f"/groups/{group_id}/expenses/", "method": "GET"}
+        "delete": {"href": href, "method": "DELETE"},
+        "members": {"href": href + "/members/", "method": "GET"},
+        "expenses": {"href": href + "/expenses/", "method": "GET"}
     }
 
 
@@ -37,14 +57,19 @@ class GroupCollection(Resource):
 
     def get(self):
         """Get all groups"""
-        groups = Group.query.all()
+        rows = db.session.execute(GROUP_LIST_QUERY).all()
         return {
             "groups": [
                 MasonBuilder(
-                    **group.serialize(short_form=True),
-                    **{"@controls": build_group_controls(group.id)}
+                    id=row.uuid,
+                    name=row.name,
+                    description=row.description,
+                    created_by=row.creator_uuid,
+                    created_at=row.created_at,
+                    updated_at=row.updated_at,
+                    **{"@controls": build_group_controls(row.id)}
                 )
-                for group in groups
+                for row in rows
             ],
             "@controls": {
                 "self": {"href": "/groups/"},
@@ -52,7 +77,7 @@ class GroupCollection(Resource):
                     "href": "/groups/",
                     "method": "POST",
                     "encoding": "json",
-                    "schema": Group.get_schema()
+                    "schema": GROUP_SCHEMA
                 }
             }
         }, 200
@@ -61,16 +86,17 @@ class GroupCollection(Resource):
     def post(self):
         """Create a new group"""
         # g.user_id = 1
-        if not request.json:
+        data = request.json
+        if not data:
             raise UnsupportedMediaType("Request must be JSON")
 
         try:
-            validate(instance=request.json, schema=Group.get_schema())
+            Group.validate(data)
         except ValidationError as e:
             raise BadRequest(f"Validation error: {e.message}") from e
 
         group = Group(created_by=g.user_id)
-        group.deserialize(request.json)
+        group.deserialize(data)
 
         db.session.add(group)
         db.session.flush()
@@ -80,11 +106,8 @@ class GroupCollection(Resource):
 
         db.session.commit()
 
-        cache.delete("groups")
-
         response = MasonBuilder(**group.serialize())
-        for name, props in build_group_controls(group.uuid).items():
-            response.add_control(name, **props)
+        response["@controls"] = build_group_controls(group.uuid)
 
         return response, 201
 
@@ -92,53 +115,43 @@ class GroupCollection(Resource):
 class GroupItem(Resource):
     """Resource for individual Group objects"""
 
-    @cache.cached(timeout=30)
+    @revision_cached("groups/{group.uuid}")
     def get(self, group):
         """Get group details"""
+        # Only the detail view serializes the members, so they are loaded
+        # here (users joined in) rather than on every group lookup
+        group = db.session.execute(
+            select(Group).options(selectinload(Group.members)).where(Group.id == group.id)
+        ).scalar_one()
         response = MasonBuilder(**group.serialize())
-        for name, props in build_group_controls(group.id).items():
-            response.add_control(name, **props)
+        response["@controls"] = build_group_controls(group.id)
         return response, 200
 
     @require_api_key
     def put(self, group):
         """Update group details"""
-        member = GroupMember.query.filter_by(
-            user_id=g.user_id, group_id=group.id
-        ).first()
-        if not member or member.role != "admin":
+        if get_member_role(g.user_id, group.id) != "admin":
             raise Forbidden("Only group admins can update group details")
 
-        if not request.json:
+        data = request.json
+        if not data:
             raise UnsupportedMediaType("Request must be JSON")
 
-        group.deserialize(request.json)
+        group.deserialize(data)
         db.session.commit()
 
-        cache.delete(f"groups/{group.uuid}")
-        cache.delete("groups")
-        cache.delete(f"groups/{group.uuid}/members")
-
         response = MasonBuilder(**group.serialize())
-        for name, props in build_group_controls(group.uuid).items():
-            response.add_control(name, **props)
+        response["@controls"] = build_group_controls(group.uuid)
 
         return response, 200
 
     @require_api_key
     def delete(self, group):
         """Delete group"""
-        member = GroupMember.query.filter_by(
-            user_id=g.user_id, group_id=group.id
-        ).first()
-        if not member or member.role != "admin":
+        if get_member_role(g.user_id, group.id) != "admin":
             raise Forbidden("Only group admins can delete the group")
 
         db.session.delete(group)
         db.session.commit()
 
-        cache.delete(f"groups/{group.uuid}")
-        cache.delete("groups")
-        cache.delete(f"groups/{group.uuid}/members")
-
         return "", 204
@@ -2,6 +2,7 @@
 
 from flask import request, g
 from flask_restful import Resource
+from sqlalchemy import select
 from werkzeug.exceptions import (
     Conflict,
     NotFound,
@@ -10,15 +11,43 @@ from werkzeug.exceptions import (
     Forbidden,
 )
 
-from expenses import cache
-from expenses.utils import require_api_key, MasonBuilder
+from expenses.utils import (
+    require_api_key,
+    get_by_uuid,
+    get_member_role,
+    is_group_member,
+    MasonBuilder,
+)
 from expenses.models import db, User, GroupMember
 
 
+# Columns needed for the member listing, with the member's user joined in.
+MEMBER_LIST_QUERY = select(
+    GroupMember.uuid,
+    GroupMember.user_id,
+    User.uuid.label("user_uuid"),
+    User.name.label("user_name"),
+    GroupMember.role,
+    GroupMember.joined_at,
+).join(User, GroupMember.user_id == User.id)
+
+
+# JSON schema for adding a member to a group
+MEMBER_SCHEMA = {
+    "type": "object",
+    "required": ["user_id"],
+    "properties": {
+        "user_id": {"type": "string"},
+        "role": {"type": "string"}
+    }
+}
+
+
 def build_member_controls(group_id, user_id):
+    href = f"/groups/{group_id}/members/{user_id}"
     return {
-        "self": {"href": f"/groups/{group_id}/members/{user_id}"},
-        "delete": {"href": f"/groups/{group_id}/members/{user_id}", "method": "DELETE"},
+        "self": {"href": href},
+        "delete": {"href": href, "method": "DELETE"},
         "user": {"href": f"/users/{user_id}", "method": "GET"}
     }
 
@@ -30,14 +59,7 @@ def build_member_collection_controls(group_id):
             "href": f"/groups/{group_id}/members/",
             "method": "POST",
             "encoding": "json",
-            "schema": {
-                "type": "object",
-                "required": ["user_id"],
-                "properties": {
-                    "user_id": {"type": "string"},
-                    "role": {"type": "string"}
-                }
-            }
+            "schema": MEMBER_SCHEMA
         }
     }
 
@@ -50,51 +72,52 @@ class GroupMemberCollection(Resource):
         res = MasonBuilder()
         res["members"] = []
 
-        members = GroupMember.query.filter_by(group_id=group.id).all()
-        for member in members:
-            member_data = MasonBuilder(**member.serialize())
-            for name, props in build_member_controls(group.uuid, member.user_id).items():
-                member_data.add_control(name, **props)
+        rows = db.session.execute(
+            MEMBER_LIST_QUERY.where(GroupMember.group_id == group.id)
+        ).all()
+        for row in rows:
+            member_data = MasonBuilder(
+                id=row.uuid,
+                user_id=row.user_uuid,
+                group_id=group.uuid,
+                role=row.role,
+                joined_at=row.joined_at,
+                user_name=row.user_name,
+            )
+            member_data["@controls"] = build_member_controls(group.uuid, row.user_id)
             res["members"].append(member_data)
 
-        for name, props in build_member_collection_controls(group.uuid).items():
-            res.add_control(name, **props)
+        res["@controls"] = build_member_collection_controls(group.uuid)
 
         return res, 200
 
     @require_api_key
     def post(self, group):
         """Add a member to a group"""
-        member_check = GroupMember.query.filter_by(
-            user_id=g.user_id, group_id=group.id
-        ).first()
-        if not member_check or member_check.role != "admin":
+        if get_member_role(g.user_id, group.id) != "admin":
             raise Forbidden("Only group admins can add members")
 
-        if not request.json:
+        data = request.json
+        if not data:
             raise UnsupportedMediaType("Request must be JSON")
 
-        user_uuid = request.json["user_id"]
-        user = User.query.filter_by(uuid=user_uuid).first()
+        user_uuid = data["user_id"]
+        user = get_by_uuid(User, user_uuid)
         if not user:
             raise BadRequest(f"User {user_uuid} does not exist")
 
-        existing_member = GroupMember.query.filter_by(
-            user_id=user.id, group_id=group.id
-        ).first()
-        if existing_member:
+        if is_group_member(user.id, group.id):
             raise Conflict(f"User {user_uuid} is already a member of this group")
 
         member = GroupMember(user_id=user.id, group_id=group.id)
-        if "role" in request.json:
-            member.role = request.json["role"]
+        if "role" in data:
+            member.role = data["role"]
 
         db.session.add(member)
         db.session.commit()
 
         res = MasonBuilder(**member.serialize())
-        for name, props in build_member_controls(group.uuid, user.id).items():
-            res.add_control(name, **props)
+        res["@controls"] = build_member_controls(group.uuid, user.id)
 
         return res, 201
 
@@ -106,13 +129,10 @@ class GroupMemberItem(Resource):
     def delete(self, group, user):
         """Remove member from group"""
         if g.user_id != user.id:
-            admin_check = GroupMember.query.filter_by(
-                user_id=g.user_id, group_id=group.id, role="admin"
-            ).first()
-            if not admin_check:
+            if get_member_role(g.user_id, group.id) != "admin":
                 raise Forbidden("Only group admins can remove other members")
 
-        member = GroupMember.query.filter_by(user_id=user.id, group_id=group.id).first()
+        member = GroupMember.query.filter_by(user_id=user.id, group_id=group.id).one_or_none()
         if not member:
             raise NotFound(f"User {user.uuid} is not a member of group {group.uuid}")
 
@@ -126,7 +146,4 @@ class GroupMemberItem(Resource):
         db.session.delete(member)
         db.session.commit()
 
-        cache.delete(f"groups/{group.uuid}/members")
-        cache.delete(f"groups/{group.uuid}")
-
         return "", 204
@@ -3,22 +3,29 @@
 import secrets
 from flask import request, g
 from flask_restful import Resource
-from jsonschema import validate, ValidationError
+from sqlalchemy import select
+from jsonschema import ValidationError
 from werkzeug.exceptions import Conflict, BadRequest, UnsupportedMediaType, Forbidden
 
-from expenses import cache
-from expenses.utils import require_api_key, MasonBuilder
-from expenses.models import db, User, ApiKey
+from expenses.utils import require_api_key, revision_cached, MasonBuilder
+from expenses.models import db, User, ApiKey, USER_SCHEMA
+
+
+# Columns needed for the short-form user listing; avoids hydrating ORM objects.
+USER_LIST_QUERY = select(
+    User.id, User.uuid, User.name, User.email, User.created_at, User.updated_at
+)
 
 
 def build_user_controls(user_id):
+    href = f"/users/{user_id}"
     return {
-        "self": {"href": f"/users/{user_id}"},
+        "self": {"href": href},
         "update": {
-            "href": f"/users/{user_id}",
+            "href": href,
             "method": "PUT",
             "encoding": "json",
-            "schema": User.get_schema()
+            "schema": USER_SCHEMA
         }
     }
 
@@ -30,7 +37,7 @@ def build_user_collection_controls():
             "href": "/users/",
             "method": "POST",
             "encoding": "json",
-            "schema": User.get_schema()
+            "schema": USER_SCHEMA
         }
     }
 
@@ -38,54 +45,56 @@ def build_user_collection_controls():
 class UserCollection(Resource):
     """Resource for collection of User objects"""
 
-    @cache.cached(timeout=60)
+    @revision_cached("users", timeout=60)
     def get(self):
         """Get all users"""
-        users = User.query.all()
+        rows = db.session.execute(USER_LIST_QUERY).all()
         res = MasonBuilder()
         res["users"] = []
 
-        for user in users:
-            user_doc = MasonBuilder(**user.serialize(short_form=True))
-            for name, props in build_user_controls(user.id).items():
-                user_doc.add_control(name, **props)
+        for row in rows:
+            user_doc = MasonBuilder(
+                id=row.uuid,
+                name=row.name,
+                email=row.email,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+            )
+            user_doc["@controls"] = build_user_controls(row.id)
             res["users"].append(user_doc)
 
-        for name, props in build_user_collection_controls().items():
-            res.add_control(name, **props)
+        res["@controls"] = build_user_collection_controls()
 
         return res, 200
 
     def post(self):
         """Create a new user"""
-        if not request.json:
+        data = request.json
+        if not data:
             raise UnsupportedMediaType("Request must be JSON")
 
         try:
-            validate(instance=request.json, schema=User.get_schema())
+            User.validate(data)
         except ValidationError as e:
             raise BadRequest(f"Validation error: {e.message}") from e
 
-        existing_user = User.query.filter_by(email=request.json["email"]).first()
+        existing_user = User.query.filter_by(email=data["email"]).one_or_none()
         if existing_user:
-            raise Conflict(f"User with email {request.json['email']} already exists")
+            raise Conflict(f"User with email {data['email']} already exists")
 
         user = User()
-        user.deserialize(request.json)
+        user.deserialize(data)
         db.session.add(user)
-        db.session.commit()
+        db.session.flush()
 
         api_key = secrets.token_urlsafe(32)
         db_key = ApiKey(key_hash=ApiKey.get_hash(api_key), user_id=user.id)
         db.session.add(db_key)
         db.session.commit()
 
-        cache.delete("users")
-
         res = MasonBuilder(**user.serialize())
         res["api_key"] = api_key
-        for name, props in build_user_controls(user.uuid).items():
-            res.add_control(name, **props)
+        res["@controls"] = build_user_controls(user.uuid)
 
         return res, 201
 
@@ -93,12 +102,11 @@ class UserCollection(Resource):
 class UserItem(Resource):
     """Resource for individual User objects"""
 
-    @cache.cached(timeout=60)
+    @revision_cached("users/{user.uuid}", timeout=60)
     def get(self, user):
         """Get user details"""
         res = MasonBuilder(**user.serialize())
-        for name, props in build_user_controls(user.uuid).items():
-            res.add_control(name, **props)
+        res["@controls"] = build_user_controls(user.uuid)
         return res, 200
 
     @require_api_key
@@ -107,23 +115,20 @@ class UserItem(Resource):
         if g.user_id != user.id:
             raise Forbidden("You can only update your own account")
 
-        if not request.json:
+        data = request.json
+        if not data:
             raise UnsupportedMediaType("Request must be JSON")
 
-        if "email" in request.json and request.json["email"] != user.email:
-            existing_user = User.query.filter_by(email=request.json["email"]).first()
+        if "email" in data and data["email"] != user.email:
+            existing_user = User.query.filter_by(email=data["email"]).one_or_none()
             if existing_user:
-                raise Conflict(f"User with email {request.json['email']} already exists")
+                raise Conflict(f"User with email {data['email']} already exists")
 
-        user.deserialize(request.json)
+        user.deserialize(data)
         db.session.commit()
 
-        cache.delete(f"users/{user.uuid}")
-        cache.delete("users")
-
         res = MasonBuilder(**user.serialize())
-        for name, props in build_user_controls(user.uuid).items():
-            res.add_control(name, **props)
+        res["@controls"] = build_user_controls(user.uuid)
 
         return res, 200
 
@@ -136,7 +141,4 @@ class UserItem(Resource):
         db.session.delete(user)
         db.session.commit()
 
-        cache.delete(f"users/{user.uuid}")
-        cache.delete("users")
-
         return "", 204
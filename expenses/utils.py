@@ -5,42 +5,486 @@ This module contains helper functions, decorators, and URL converters
 that are used throughout the application.
 """
 
-from flask import request, g
+import functools
+import hashlib
+import secrets
+
+import orjson
+from flask import current_app, request, g
+from sqlalchemy import bindparam, event, lambda_stmt, select
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+from sqlalchemy.orm.util import identity_key
 from werkzeug.exceptions import NotFound, Forbidden
 from werkzeug.routing import BaseConverter
 
-from expenses.models import User, ApiKey, Group, Expense
+from expenses.extensions import db, cache
+from expenses.models import (
+    User,
+    ApiKey,
+    Group,
+    GroupMember,
+    Expense,
+    ExpenseParticipant,
+    UUIDMatch,
+)
+
+
+# Hot lookups as lambda statements: SQLAlchemy builds and caches each one on
+# first use, so later executions skip statement construction and compilation.
+API_KEY_OWNER_QUERY = lambda_stmt(
+    lambda: select(ApiKey.user_id).where(ApiKey.key_hash == bindparam("key_hash"))
+)
+UUID_QUERIES = {
+    User: lambda_stmt(
+        lambda: select(User).where(User.uuid == bindparam("uuid", type_=UUIDMatch()))
+    ),
+    Group: lambda_stmt(
+        lambda: select(Group).where(Group.uuid == bindparam("uuid", type_=UUIDMatch()))
+    ),
+    # Expense views read the denormalized group_uuid, never the group itself.
+    # Any relationship access that would emit SQL beyond the ones loaded
+    # here raises: handlers needing a new relationship must add it here. The
+    # wildcard also replaces the lazy="joined" default of ExpenseParticipant.user,
+    # so the participants' users are loaded explicitly.
+    Expense: lambda_stmt(
+        lambda: select(Expense)
+        .options(
+            joinedload(Expense.creator),
+            selectinload(Expense.participants).joinedload(ExpenseParticipant.user),
+            raiseload("*", sql_only=True),
+        )
+        .where(Expense.uuid == bindparam("uuid", type_=UUIDMatch()))
+    ),
+}
 
 
 # Authentication helpers
+API_KEY_CACHE_TIMEOUT = 30
+
+
+def api_key_cache_key(key_hash):
+    """
+    Build the cache key under which an API key's owner is remembered.
+
+    Args:
+        key_hash: SHA-256 hex digest of the API key
+
+    Returns:
+        str: Cache key for the key hash
+    """
+    return f"api_keys/{key_hash}"
+
+
 def require_api_key(func):
     """
     Decorator to require API key for a resource method.
 
+    The authenticated key and its owner are remembered on ``g`` for the rest
+    of the request, so stacked or repeated checks neither re-hash the key
+    nor look it up again.
+
     Args:
         func: The function to decorate
 
     Returns:
         Function wrapper that checks for a valid API key
     """
+    get_hash = ApiKey.get_hash
 
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
         api_key = request.headers.get("X-API-Key")
         if not api_key:
             raise Forbidden("API key is required")
 
-        key_hash = ApiKey.get_hash(api_key)
-        db_key = ApiKey.query.filter_by(key_hash=key_hash).first()
-
-        if not db_key:
-            raise Forbidden("Invalid API key")
-
-        g.user_id = db_key.user_id
+        owner = g.get("_api_key_owner")
+        if owner is not None and owner[0] == api_key:
+            g.user_id = owner[1]
+            return func(*args, **kwargs)
+
+        key_hash = get_hash(api_key)
+        cache_key = api_key_cache_key(key_hash)
+        user_id = cache.get(cache_key)
+
+        if user_id is None:
+            user_id = db.session.execute(
+                API_KEY_OWNER_QUERY, {"key_hash": key_hash}
+            ).scalar_one_or_none()
+            if user_id is None:
+                raise Forbidden("Invalid API key")
+            cache.set(cache_key, user_id, timeout=API_KEY_CACHE_TIMEOUT)
+
+        g._api_key_owner = (api_key, user_id)  # pylint: disable=protected-access
+        g.user_id = user_id
         return func(*args, **kwargs)
 
     return wrapper
 
 
+def get_by_uuid(model, value):
+    """
+    Look up a model instance by UUID, memoized for the current request.
+
+    Nested routes resolve several converters per request; the lookups are
+    kept in ``g._uuid_cache`` so repeated UUIDs never hit the database twice.
+    ``g`` belongs to the request's app context, so the cache goes with it.
+
+    Args:
+        model: The model class to query, one of the keys of UUID_QUERIES
+        value: UUID string to look up
+
+    Returns:
+        The matching instance, or None if it does not exist
+    """
+    uuid_cache = g.setdefault("_uuid_cache", {})
+    key = (model, value)
+    if key not in uuid_cache:
+        uuid_cache[key] = db.session.execute(
+            UUID_QUERIES[model], {"uuid": value}
+        ).scalar_one_or_none()
+    return uuid_cache[key]
+
+
+# Membership helpers
+def get_membership(user_id, group_id):
+    """
+    Look up a user's membership in a group, memoized for the current request.
+
+    Only the role is selected, through the unique (user_id, group_id) index.
+    Results are kept in ``g._membership_cache`` so permission checks and
+    membership tests in the same request share one query.
+
+    Args:
+        user_id: ID of the user
+        group_id: ID of the group
+
+    Returns:
+        Row: A row with the member's ``role``, or None if the user is not a member
+    """
+    membership_cache = g.setdefault("_membership_cache", {})
+    key = (user_id, group_id)
+    if key not in membership_cache:
+        membership_cache[key] = db.session.execute(
+            select(GroupMember.role).where(
+                GroupMember.user_id == user_id, GroupMember.group_id == group_id
+            )
+        ).first()
+    return membership_cache[key]
+
+
+def get_member_role(user_id, group_id):
+    """
+    Look up a user's role in a group without loading the membership row.
+
+    Args:
+        user_id: ID of the user
+        group_id: ID of the group
+
+    Returns:
+        str: The member's role, or None if the user is not a member
+    """
+    membership = get_membership(user_id, group_id)
+    return membership.role if membership is not None else None
+
+
+def is_group_member(user_id, group_id):
+    """
+    Check whether a user belongs to a group.
+
+    Args:
+        user_id: ID of the user
+        group_id: ID of the group
+
+    Returns:
+        bool: True if the user is a member of the group
+    """
+    return get_membership(user_id, group_id) is not None
+
+
+# Caching helpers
+def revision_key(scope):
+    """
+    Build the cache key holding the current revision of a scope.
+
+    Args:
+        scope: Resource scope such as ``"users"`` or ``"groups/<uuid>"``
+
+    Returns:
+        str: Cache key for the scope's revision token
+    """
+    return f"rev:{scope}"
+
+
+def bump_revision(*scopes):
+    """
+    Invalidate every cached view that depends on the given scopes.
+
+    Views cache their results under the revisions current at read time, so
+    replacing a revision makes all of those entries unreachable at once;
+    they simply age out of the cache. Revisions are random tokens rather
+    than counters, so every scope of a commit is written with a single
+    ``set_many`` call (one round trip on Redis) instead of one ``inc`` per
+    scope. They are written without a timeout, so they outlive the views
+    cached under them.
+
+    Args:
+        *scopes: Resource scopes that were modified
+    """
+    revision = secrets.token_hex(8)
+    cache.set_many({revision_key(scope): revision for scope in scopes}, timeout=0)
+
+
+def current_revisions(names):
+    """
+    Read the revision tokens of the given scopes, starting missing ones.
+
+    A scope without a revision (never bumped, or evicted from the cache)
+    gets a fresh random token rather than a fixed default, so views cached
+    under an earlier revision of it are never served again. ``add`` only
+    writes a key that is still missing, so concurrent readers settle on the
+    same token.
+
+    Args:
+        names: Resource scope names
+
+    Returns:
+        list: The revision token of each scope
+    """
+    keys = [revision_key(name) for name in names]
+    revisions = cache.get_many(*keys)
+    if None not in revisions:
+        return revisions
+
+    started = {}
+    for key, revision in zip(keys, revisions):
+        if revision is None:
+            started[key] = secrets.token_hex(8)
+            cache.add(key, started[key], timeout=0)
+    revisions = cache.get_many(*keys)
+    return [
+        started.get(key) if revision is None else revision
+        for key, revision in zip(keys, revisions)
+    ]
+
+
+def flushed_values(model, pk, *columns):
+    """
+    Read columns of a row by primary key while a flush is in progress.
+
+    Pending objects only carry foreign-key ids; their relationships are not
+    loaded. The row is read from the identity map when it is already there,
+    otherwise with a plain column SELECT that adds nothing to the session.
+
+    Args:
+        model: Model class of the row
+        pk: Primary key of the row
+        *columns: Columns of ``model`` to read
+
+    Returns:
+        tuple: The column values, or None if the row does not exist
+    """
+    instance = db.session.identity_map.get(identity_key(model, pk))
+    if instance is not None and all(c.key in instance.__dict__ for c in columns):
+        return tuple(getattr(instance, column.key) for column in columns)
+    return db.session.execute(select(*columns).where(model.id == pk)).first()
+
+
+def related_scope(model, pk, prefix):
+    """
+    Build the scope of a related row, looking its UUID up by primary key.
+
+    Args:
+        model: Model class of the related row
+        pk: Primary key of the related row
+        prefix: Scope prefix for the model, e.g. ``"groups"``
+
+    Returns:
+        list: The ``<prefix>/<uuid>`` scope, or an empty list if the row is gone
+    """
+    row = flushed_values(model, pk, model.uuid)
+    return [] if row is None else [f"{prefix}/{row[0]}"]
+
+
+def revision_scopes(instance):  # pylint: disable=too-many-return-statements
+    """
+    Map a changed model instance to the revision scopes it invalidates.
+
+    Related rows are resolved through the foreign-key columns, so this also
+    works for pending objects built from ids alone. A change is also
+    pushed to the detail views that list the row: users show the groups
+    they created or joined, and groups show their members and expenses.
+
+    Args:
+        instance: A new, modified or deleted model instance
+
+    Returns:
+        list: Scope names to bump once the change is committed
+    """
+    if isinstance(instance, User):
+        return ["users", f"users/{instance.uuid}"]
+    if isinstance(instance, Group):
+        return [
+            "groups",
+            f"groups/{instance.uuid}",
+            *related_scope(User, instance.created_by, "users"),
+        ]
+    if isinstance(instance, GroupMember):
+        return [
+            *related_scope(Group, instance.group_id, "groups"),
+            *related_scope(User, instance.user_id, "users"),
+        ]
+    if isinstance(instance, Expense):
+        return [
+            f"expenses/{instance.uuid}",
+            f"groups/{instance.group_uuid}",
+            f"groups/{instance.group_uuid}/expenses",
+        ]
+    if isinstance(instance, ExpenseParticipant):
+        expense = flushed_values(
+            Expense, instance.expense_id, Expense.uuid, Expense.group_uuid
+        )
+        if expense is None:
+            return []
+        expense_uuid, group_uuid = expense
+        return [f"expenses/{expense_uuid}", f"groups/{group_uuid}/expenses"]
+    return []
+
+
+def mark_stale(*scopes):
+    """
+    Queue revision scopes to be bumped when the current transaction commits.
+
+    Flushed ORM changes are queued automatically; this is only needed for
+    changes made with bulk statements, which bypass the unit of work.
+
+    Args:
+        *scopes: Resource scopes that were modified
+    """
+    db.session.info.setdefault("stale_scopes", set()).update(scopes)
+
+
+@event.listens_for(db.session, "after_flush")
+def collect_stale_scopes(session, flush_context):  # pylint: disable=unused-argument
+    """Queue the scopes and API key cache entries touched by a flush.
+
+    Memoized memberships of flushed group members are dropped right away, so
+    checks later in the same request see the write.
+    """
+    scopes = session.info.setdefault("stale_scopes", set())
+    keys = session.info.setdefault("stale_keys", set())
+    membership_cache = g.get("_membership_cache", {})
+    for instance in (*session.new, *session.deleted):
+        scopes.update(revision_scopes(instance))
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, GroupMember):
+            membership_cache.pop((instance.user_id, instance.group_id), None)
+    # Assigning an attribute its current value marks an instance dirty too
+    for instance in session.dirty:
+        if session.is_modified(instance, include_collections=False):
+            scopes.update(revision_scopes(instance))
+    for instance in session.deleted:
+        if isinstance(instance, ApiKey):
+            keys.add(api_key_cache_key(instance.key_hash))
+
+
+@event.listens_for(db.session, "after_commit")
+def invalidate_stale_scopes(session):
+    """Bump the queued revisions and evict queued keys after a commit."""
+    scopes = session.info.pop("stale_scopes", None)
+    keys = session.info.pop("stale_keys", None)
+    if "cache" not in current_app.extensions:
+        return
+    if scopes:
+        bump_revision(*scopes)
+    if keys:
+        cache.delete_many(*keys)
+
+
+@event.listens_for(db.session, "after_rollback")
+def discard_stale_scopes(session):
+    """Forget queued invalidations when the transaction is rolled back."""
+    session.info.pop("stale_scopes", None)
+    session.info.pop("stale_keys", None)
+
+
+def dump_json(data):
+    """
+    Encode a response document with orjson.
+
+    orjson encodes datetimes natively, so models hand datetime objects to the
+    response layer as-is. Naive values (SQLite drops the offset) are marked UTC.
+
+    Args:
+        data: JSON-serializable response document
+
+    Returns:
+        bytes: The encoded document
+    """
+    return orjson.dumps(data, option=orjson.OPT_NAIVE_UTC)
+
+
+def make_etag(payload):
+    """
+    Compute an entity tag for an encoded response body.
+
+    Args:
+        payload: Encoded response body
+
+    Returns:
+        str: Hex digest identifying the body's content
+    """
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def revision_cached(*scopes, timeout=30):
+    """
+    Decorator caching a GET handler under the revisions of its scopes.
+
+    Scopes are format strings filled in from the view arguments, e.g.
+    ``"groups/{group.uuid}"``. Committed changes bump the same scope names
+    through :func:`revision_scopes`, so writers never delete cache keys.
+
+    The body is cached already encoded, together with a weak ETag of its
+    content, so a hit neither rebuilds nor re-serializes the document. A
+    request whose If-None-Match matches the ETag gets an empty 304.
+
+    Args:
+        *scopes: Scope templates the cached result depends on
+        timeout: Cache timeout in seconds
+
+    Returns:
+        Decorator for a resource method
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            names = [scope.format(**kwargs) for scope in scopes]
+            version = ".".join(current_revisions(names))
+            cache_key = f"view:{request.path}:v{version}"
+
+            entry = cache.get(cache_key)
+            if entry is None:
+                body, status = func(*args, **kwargs)
+                payload = dump_json(body)
+                entry = (payload, status, make_etag(payload))
+                cache.set(cache_key, entry, timeout=timeout)
+
+            payload, status, etag = entry
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.response_class(
+                    payload, status=status, mimetype="application/json"
+                )
+            response.set_etag(etag, weak=True)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
 class UserConverter(BaseConverter):
     """
     URL converter for User model.
@@ -61,7 +505,7 @@ class UserConverter(BaseConverter):
         Raises:
             NotFound: If the user with the given UUID does not exist
         """
-        user = User.query.filter_by(uuid=value).first()
+        user = get_by_uuid(User, value)
         if not user:
             raise NotFound(f"User {value} does not exist")
         return user
@@ -99,7 +543,7 @@ class GroupConverter(BaseConverter):
         Raises:
             NotFound: If the group with the given UUID does not exist
         """
-        group = Group.query.filter_by(uuid=value).first()
+        group = get_by_uuid(Group, value)
         if not group:
             raise NotFound(f"Group {value} does not exist")
         return group
@@ -137,7 +581,7 @@ class ExpenseConverter(BaseConverter):
         Raises:
             NotFound: If the expense with the given UUID does not exist
         """
-        expense = Expense.query.filter_by(uuid=value).first()
+        expense = get_by_uuid(Expense, value)
         if not expense:
             raise NotFound(f"Expense {value} does not exist")
         return expense
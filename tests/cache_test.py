@@ -0,0 +1,228 @@
+"""
+Tests for the cached GET views and their invalidation.
+
+These run against the SimpleCache application, so responses are really
+stored and served from the cache between requests.
+"""
+
+import json
+
+from expenses.extensions import cache
+from expenses.models import db, User
+from expenses.utils import revision_key
+from tests.conftest import create_user, get_auth_headers
+
+
+class TestCachedViews:
+    """Test cases for revision-cached views"""
+
+    def test_cached_view_is_reused(self, cached_client):
+        """Test GET /api/users/<user_id> twice - Second response should come from the cache"""
+        create_user(cached_client)
+        user = User.query.first()
+        user_uuid = user.uuid
+
+        response = cached_client.get(f"/api/users/{user_uuid}")
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+
+        # A bulk UPDATE bypasses the unit of work, so nothing is invalidated
+        db.session.execute(
+            User.__table__.update()
+            .where(User.__table__.c.id == user.id)
+            .values(name="Changed Behind The Cache")
+        )
+        db.session.commit()
+
+        response = cached_client.get(f"/api/users/{user_uuid}")
+        assert response.status_code == 200
+        assert response.headers["ETag"] == etag
+        assert json.loads(response.data)["name"] == "Test User"
+
+    def test_write_invalidates_item_and_list(self, cached_client):
+        """Test PUT /api/users/<user_id> - Cached item and list views should show the update"""
+        api_key = create_user(cached_client)
+        user_uuid = User.query.first().uuid
+
+        response = cached_client.get(f"/api/users/{user_uuid}")
+        assert json.loads(response.data)["name"] == "Test User"
+        response = cached_client.get("/api/users/")
+        assert json.loads(response.data)["users"][0]["name"] == "Test User"
+
+        response = cached_client.put(
+            f"/api/users/{user_uuid}",
+            data=json.dumps({"name": "Updated Name"}),
+            headers=get_auth_headers(api_key),
+        )
+        assert response.status_code == 200
+
+        response = cached_client.get(f"/api/users/{user_uuid}")
+        assert json.loads(response.data)["name"] == "Updated Name"
+        response = cached_client.get("/api/users/")
+        assert json.loads(response.data)["users"][0]["name"] == "Updated Name"
+
+    def test_expense_write_invalidates_item_and_list(self, cached_client):
+        """Test PUT /api/expenses/<expense_id> - Cached expense and group expense list should show the update"""
+        api_key = create_user(cached_client)
+        response = cached_client.post(
+            "/api/groups/",
+            data=json.dumps({"name": "Cached Group"}),
+            headers=get_auth_headers(api_key),
+        )
+        group_uuid = json.loads(response.data)["id"]
+
+        response = cached_client.post(
+            f"/api/groups/{group_uuid}/expenses/",
+            data=json.dumps({"amount": 30.00, "description": "Lunch"}),
+            headers=get_auth_headers(api_key),
+        )
+        expense_uuid = json.loads(response.data)["id"]
+
+        response = cached_client.get(f"/api/expenses/{expense_uuid}")
+        assert json.loads(response.data)["description"] == "Lunch"
+        response = cached_client.get(f"/api/groups/{group_uuid}/expenses/")
+        assert json.loads(response.data)["expenses"][0]["description"] == "Lunch"
+
+        response = cached_client.put(
+            f"/api/expenses/{expense_uuid}",
+            data=json.dumps({"amount": 30.00, "description": "Dinner"}),
+            headers=get_auth_headers(api_key),
+        )
+        assert response.status_code == 200
+
+        response = cached_client.get(f"/api/expenses/{expense_uuid}")
+        assert json.loads(response.data)["description"] == "Dinner"
+        response = cached_client.get(f"/api/groups/{group_uuid}/expenses/")
+        assert json.loads(response.data)["expenses"][0]["description"] == "Dinner"
+
+    def test_evicted_revision_does_not_revive_old_views(self, cached_client):
+        """Test GET after a revision is evicted - Should not serve a view cached before the update"""
+        api_key = create_user(cached_client)
+        user_uuid = User.query.first().uuid
+        key = revision_key(f"users/{user_uuid}")
+
+        cache.delete(key)
+        response = cached_client.get(f"/api/users/{user_uuid}")
+        assert json.loads(response.data)["name"] == "Test User"
+
+        cached_client.put(
+            f"/api/users/{user_uuid}",
+            data=json.dumps({"name": "Updated Name"}),
+            headers=get_auth_headers(api_key),
+        )
+        response = cached_client.get(f"/api/users/{user_uuid}")
+        assert json.loads(response.data)["name"] == "Updated Name"
+
+        cache.delete(key)
+        response = cached_client.get(f"/api/users/{user_uuid}")
+        assert json.loads(response.data)["name"] == "Updated Name"
+
+    def test_matching_if_none_match_returns_304(self, cached_client):
+        """Test GET with a matching If-None-Match - Should return 304 until the resource changes"""
+        api_key = create_user(cached_client)
+        user_uuid = User.query.first().uuid
+
+        response = cached_client.get(f"/api/users/{user_uuid}")
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+
+        response = cached_client.get(
+            f"/api/users/{user_uuid}", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.data == b""
+        assert response.headers["ETag"] == etag
+
+        cached_client.put(
+            f"/api/users/{user_uuid}",
+            data=json.dumps({"name": "Updated Name"}),
+            headers=get_auth_headers(api_key),
+        )
+
+        response = cached_client.get(
+            f"/api/users/{user_uuid}", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert json.loads(response.data)["name"] == "Updated Name"
+
+    def test_group_changes_refresh_creator_view(self, cached_client):
+        """Test POST /api/groups/ - Cached creator should list the new group"""
+        api_key = create_user(cached_client)
+        user_uuid = User.query.first().uuid
+
+        response = cached_client.get(f"/api/users/{user_uuid}")
+        assert json.loads(response.data)["created_groups"] == []
+
+        response = cached_client.post(
+            "/api/groups/",
+            data=json.dumps({"name": "New Group"}),
+            headers=get_auth_headers(api_key),
+        )
+        group_uuid = json.loads(response.data)["id"]
+
+        response = cached_client.get(f"/api/users/{user_uuid}")
+        data = json.loads(response.data)
+        assert data["created_groups"] == [group_uuid]
+        assert data["group_memberships"] == [group_uuid]
+
+    def test_member_changes_refresh_user_view(self, cached_client):
+        """Test POST /api/groups/<group_id>/members/ - Cached member should list the group"""
+        admin_key = create_user(cached_client, name="Admin", email="admin@example.com")
+        create_user(cached_client, name="Member", email="member@example.com")
+        member_uuid = User.query.filter_by(email="member@example.com").first().uuid
+
+        response = cached_client.post(
+            "/api/groups/",
+            data=json.dumps({"name": "Member Group"}),
+            headers=get_auth_headers(admin_key),
+        )
+        group_uuid = json.loads(response.data)["id"]
+
+        response = cached_client.get(f"/api/users/{member_uuid}")
+        assert json.loads(response.data)["group_memberships"] == []
+        response = cached_client.get(f"/api/groups/{group_uuid}")
+        assert len(json.loads(response.data)["members"]) == 1
+
+        response = cached_client.post(
+            f"/api/groups/{group_uuid}/members/",
+            data=json.dumps({"user_id": member_uuid, "role": "member"}),
+            headers=get_auth_headers(admin_key),
+        )
+        assert response.status_code == 201
+
+        response = cached_client.get(f"/api/users/{member_uuid}")
+        assert json.loads(response.data)["group_memberships"] == [group_uuid]
+        response = cached_client.get(f"/api/groups/{group_uuid}")
+        assert len(json.loads(response.data)["members"]) == 2
+
+    def test_expense_changes_refresh_group_view(self, cached_client):
+        """Test POST and DELETE of an expense - Cached group should list its expenses"""
+        api_key = create_user(cached_client)
+        response = cached_client.post(
+            "/api/groups/",
+            data=json.dumps({"name": "Expense Group"}),
+            headers=get_auth_headers(api_key),
+        )
+        group_uuid = json.loads(response.data)["id"]
+
+        response = cached_client.get(f"/api/groups/{group_uuid}")
+        assert json.loads(response.data)["expenses"] == []
+
+        response = cached_client.post(
+            f"/api/groups/{group_uuid}/expenses/",
+            data=json.dumps({"amount": 12.50, "description": "Coffee"}),
+            headers=get_auth_headers(api_key),
+        )
+        expense_uuid = json.loads(response.data)["id"]
+
+        response = cached_client.get(f"/api/groups/{group_uuid}")
+        assert json.loads(response.data)["expenses"] == [expense_uuid]
+
+        response = cached_client.delete(
+            f"/api/expenses/{expense_uuid}", headers=get_auth_headers(api_key)
+        )
+        assert response.status_code == 204
+
+        response = cached_client.get(f"/api/groups/{group_uuid}")
+        assert json.loads(response.data)["expenses"] == []
@@ -9,10 +9,17 @@ import json
 import pytest
 
 from expenses import create_app
+from expenses.extensions import cache
 from expenses.models import db
 
 # Create application with test configuration
-app = create_app({"TESTING": True})
+app = create_app(
+    {
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "CACHE_TYPE": "NullCache",
+    }
+)
 
 
 @pytest.fixture(name="client")
@@ -20,26 +27,51 @@ def fixture_client():
     """
     Configure a test client with an in-memory database for testing.
     This fixture is accessible to all test modules that import from conftest.
-    """
-    # Save original config to restore it later
-    original_db_uri = app.config["SQLALCHEMY_DATABASE_URI"]
-    original_testing = app.config.get("TESTING", False)
 
-    # Configure for testing with in-memory SQLite database
-    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
-    app.config["TESTING"] = True
-    app.config["CACHE_TYPE"] = "NullCache"  # Disable caching for tests
+    The application above is created once, already configured for testing;
+    each test only gets a fresh schema, which is dropped again afterwards.
 
+    An app context is only pushed around creating and dropping the schema.
+    Every request then gets its own app context and session, as in
+    production, so nothing memoized on ``g`` or held in the session carries
+    over from one request to the next. The client keeps the last request's
+    context until the next request, which is where tests query the models.
+    """
+    with app.app_context():
+        db.create_all()
     with app.test_client() as test_client:
-        with app.app_context():
-            db.create_all()
-            yield test_client
-            db.session.remove()
-            db.drop_all()
-
-    # Restore original configuration
-    app.config["SQLALCHEMY_DATABASE_URI"] = original_db_uri
-    app.config["TESTING"] = original_testing
+        yield test_client
+    with app.app_context():
+        db.drop_all()
+
+
+# A second application on SimpleCache for the cached-view tests; the one
+# above runs on NullCache, which never stores anything.
+cached_app = create_app(
+    {
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "CACHE_TYPE": "SimpleCache",
+    }
+)
+
+
+@pytest.fixture(name="cached_client")
+def fixture_cached_client():
+    """
+    Configure a test client for the SimpleCache application.
+
+    The cache is cleared before each test, so cached views and revisions
+    never carry over from one test to the next. Contexts are handled as in
+    the ``client`` fixture.
+    """
+    with cached_app.app_context():
+        cache.clear()
+        db.create_all()
+    with cached_app.test_client() as test_client:
+        yield test_client
+    with cached_app.app_context():
+        db.drop_all()
 
 
 def create_user(test_client, name="Test User", email="test@example.com"):
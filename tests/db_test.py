@@ -7,10 +7,14 @@ and CLI commands. All tests follow high code quality standards.
 """
 
 import hashlib
+import uuid
 from unittest.mock import patch
 
 import pytest
 from flask import Flask
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import StatementError
 from werkzeug.security import generate_password_hash
 
 
@@ -22,6 +26,10 @@ from expenses.models import (
     Expense,
     ExpenseParticipant,
     ApiKey,
+    to_cents,
+    from_cents,
+    init_db_command,
+    schema_problems,
 )
 
 
@@ -213,6 +221,78 @@ def test_expense_participant_serialize_with_balance(app_context):
     assert serialized["balance"] == 40.0  # 100 paid - 60 share = 40 balance
 
 
+def test_to_cents_rounds_half_up():
+    """Test to_cents rounding amounts half up to whole cents."""
+    # 0.285 is stored as 0.28499999... in binary, so float rounding gives 28
+    assert to_cents(0.285) == 29
+    assert to_cents(0.284) == 28
+    assert to_cents("10.005") == 1001
+    assert to_cents(100) == 10000
+    assert to_cents(None) is None
+
+
+def test_from_cents():
+    """Test from_cents converting integer cents back to currency units."""
+    assert from_cents(29) == 0.29
+    assert from_cents(10000) == 100.0
+    assert from_cents(0) == 0.0
+    assert from_cents(None) is None
+
+
+def test_money_hybrids_round_to_cents(app_context):
+    """Test that the amount, share and paid properties store rounded cents."""
+    expense = Expense(amount=33.335)
+    assert expense.amount_cents == 3334
+    assert expense.amount == 33.34
+
+    participant = ExpenseParticipant(share=0.285, paid=19.999)
+    assert participant.share_cents == 29
+    assert participant.paid_cents == 2000
+    assert participant.share == 0.29
+    assert participant.paid == 20.0
+
+
+def test_uuid_lookup_ignores_malformed_values(app_context):
+    """Test that comparing a UUID column with a malformed value matches nothing."""
+    user = User(name="UUID User", email="uuid@example.com", password_hash="hash")
+    db.session.add(user)
+    db.session.commit()
+
+    assert User.query.filter(User.uuid == "not-a-uuid").first() is None
+    assert User.query.filter(User.uuid.in_(["not-a-uuid", user.uuid])).all() == [user]
+    assert User.query.filter(User.uuid == user.uuid).first() == user
+
+
+def test_uuid_write_rejects_malformed_values(app_context):
+    """Test that storing a malformed UUID raises instead of writing NULL."""
+    user = User(name="UUID User", email="uuid@example.com", password_hash="hash")
+    user.uuid = "not-a-uuid"
+    db.session.add(user)
+    with pytest.raises(StatementError) as excinfo:
+        db.session.commit()
+    assert isinstance(excinfo.value.orig, ValueError)
+    db.session.rollback()
+
+
+def test_uuid_literal_rendering(app_context):
+    """Test that UUID comparisons render as literals the database can match."""
+    user = User(name="UUID User", email="uuid@example.com", password_hash="hash")
+    db.session.add(user)
+    db.session.commit()
+
+    stmt = select(User.id).where(User.uuid == user.uuid)
+    compiled = str(
+        stmt.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+    )
+    assert f"X'{uuid.UUID(user.uuid).hex}'" in compiled
+    assert db.session.execute(text(compiled)).scalar() == user.id
+
+    compiled = str(
+        stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    )
+    assert f"'{user.uuid}'" in compiled
+
+
 """
 Minimal tests for Click commands that don't require a Flask app context.
 """
@@ -247,6 +327,31 @@ def test_init_db_implementation():
         assert mock_create_all.call_count == 0
 
 
+def test_init_db_refuses_outdated_schema(app_context):
+    """Test that init-db stops on tables created by an older version."""
+    db.drop_all()
+    db.session.execute(
+        text(
+            "CREATE TABLE expenses (id INTEGER PRIMARY KEY, uuid VARCHAR(36), "
+            "amount NUMERIC(10, 2))"
+        )
+    )
+    db.session.commit()
+
+    problems = schema_problems()
+    assert any("amount_cents" in problem for problem in problems)
+    assert "expenses.uuid stores UUIDs as text" in problems
+
+    runner = app_context.test_cli_runner()
+    result = runner.invoke(init_db_command)
+    assert result.exit_code != 0
+    assert "older version" in result.output
+
+    result = runner.invoke(init_db_command, ["--drop"])
+    assert result.exit_code == 0
+    assert schema_problems() == []
+
+
 def test_generate_test_data_error_format():
     """Test the error message format in generate_test_data."""
     with patch("expenses.models.click.echo") as mock_echo:
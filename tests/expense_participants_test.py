@@ -6,8 +6,9 @@ including retrieving participants and managing participant details.
 """
 
 import json, pytest
+from sqlalchemy import event
 
-from expenses.models import User, Expense, ExpenseParticipant
+from expenses.models import db, User, Expense, ExpenseParticipant
 from tests.conftest import create_user, get_auth_headers
 
 
@@ -58,7 +59,25 @@ class TestExpenseParticipantEndpoints:
         assert float(data["participants"][0]["share"]) == 120.00
         assert float(data["participants"][0]["paid"]) == 120.00
 
-        
+    def test_get_expense_participants_in_fresh_session(self, client):
+        """Test GET of an expense and its participants - Should load the users in a new session"""
+        _, expense_uuid, user_uuids = create_split_expense(client, [(0, 60.00), (1, 40.00)])
+
+        # Start from an empty identity map, as a new request does in production
+        db.session.remove()
+
+        response = client.get(f"/api/expenses/{expense_uuid}")
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert {p["user_id"] for p in data["participants"]} == set(user_uuids)
+
+        db.session.remove()
+
+        response = client.get(f"/api/expenses/{expense_uuid}/participants/")
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert {p["user_id"] for p in data["participants"]} == set(user_uuids)
+
 
     # @pytest.mark.skip()
     # def test_update_participant_share(self, client):
@@ -546,3 +565,180 @@ class TestExpenseParticipantEndpoints:
         assert "@controls" in data
         assert "self" in data["@controls"]
 
+
+
+def create_split_expense(test_client, shares):
+    """
+    Create a group of two users and an expense split between them.
+
+    Args:
+        test_client: Flask test client
+        shares: List of (user index, share) pairs for the participants
+
+    Returns:
+        tuple: (admin API key, expense UUID, list of the two user UUIDs)
+    """
+    admin_key = create_user(test_client, name="Admin", email="admin@example.com")
+    create_user(test_client, name="Member", email="member@example.com")
+    user_uuids = [user.uuid for user in User.query.order_by(User.id).all()]
+
+    response = test_client.post(
+        "/api/groups/",
+        data=json.dumps({"name": "Split Group"}),
+        headers=get_auth_headers(admin_key),
+    )
+    group_uuid = json.loads(response.data)["id"]
+    test_client.post(
+        f"/api/groups/{group_uuid}/members/",
+        data=json.dumps({"user_id": user_uuids[1], "role": "member"}),
+        headers=get_auth_headers(admin_key),
+    )
+
+    expense_data = {
+        "amount": 100.00,
+        "description": "Split Expense",
+        "participants": [
+            {"user_id": user_uuids[index], "share": share, "paid": 0.00}
+            for index, share in shares
+        ],
+    }
+    response = test_client.post(
+        f"/api/groups/{group_uuid}/expenses/",
+        data=json.dumps(expense_data),
+        headers=get_auth_headers(admin_key),
+    )
+    return admin_key, json.loads(response.data)["id"], user_uuids
+
+
+def get_participants(test_client, expense_uuid):
+    """Map each participant's user UUID to its participant document."""
+    response = test_client.get(f"/api/expenses/{expense_uuid}/participants/")
+    return {p["user_id"]: p for p in json.loads(response.data)["participants"]}
+
+
+class TestExpenseParticipantUpdates:
+    """Test cases for updating participants with PUT /api/expenses/<expense_id>"""
+
+    def test_put_unchanged_participants(self, cached_client):
+        """Test PUT with the current participants - Should write nothing and keep cached views"""
+        admin_key, expense_uuid, user_uuids = create_split_expense(
+            cached_client, [(0, 60.00), (1, 40.00)]
+        )
+        response = cached_client.get(f"/api/expenses/{expense_uuid}")
+        etag = response.headers["ETag"]
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):  # pylint: disable=unused-argument
+            statements.append(statement)
+
+        update_data = {
+            "amount": 100.00,
+            "description": "Split Expense",
+            "participants": [
+                {"user_id": user_uuids[0], "share": 60.00, "paid": 0.00},
+                {"user_id": user_uuids[1], "share": 40.00, "paid": 0.00},
+            ],
+        }
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            response = cached_client.put(
+                f"/api/expenses/{expense_uuid}",
+                data=json.dumps(update_data),
+                headers=get_auth_headers(admin_key),
+            )
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+        assert response.status_code == 200
+
+        writes = [
+            statement
+            for statement in statements
+            if statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE"))
+        ]
+        assert writes == []
+
+        response = cached_client.get(
+            f"/api/expenses/{expense_uuid}", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+    def test_put_changed_share(self, client):
+        """Test PUT with a changed share - Should update the existing participant rows"""
+        admin_key, expense_uuid, user_uuids = create_split_expense(
+            client, [(0, 60.00), (1, 40.00)]
+        )
+        before = get_participants(client, expense_uuid)
+
+        update_data = {
+            "amount": 100.00,
+            "description": "Split Expense",
+            "participants": [
+                {"user_id": user_uuids[0], "share": 70.00, "paid": 100.00},
+                {"user_id": user_uuids[1], "share": 30.00, "paid": 0.00},
+            ],
+        }
+        response = client.put(
+            f"/api/expenses/{expense_uuid}",
+            data=json.dumps(update_data),
+            headers=get_auth_headers(admin_key),
+        )
+        assert response.status_code == 200
+
+        after = get_participants(client, expense_uuid)
+        assert len(after) == 2
+        assert float(after[user_uuids[0]]["share"]) == 70.00
+        assert float(after[user_uuids[0]]["paid"]) == 100.00
+        assert float(after[user_uuids[1]]["share"]) == 30.00
+        for user_uuid in user_uuids:
+            assert after[user_uuid]["id"] == before[user_uuid]["id"]
+
+    def test_put_removed_participant(self, client):
+        """Test PUT without one of the participants - Should delete only that participant"""
+        admin_key, expense_uuid, user_uuids = create_split_expense(
+            client, [(0, 60.00), (1, 40.00)]
+        )
+        before = get_participants(client, expense_uuid)
+
+        update_data = {
+            "amount": 100.00,
+            "description": "Split Expense",
+            "participants": [{"user_id": user_uuids[0], "share": 100.00, "paid": 0.00}],
+        }
+        response = client.put(
+            f"/api/expenses/{expense_uuid}",
+            data=json.dumps(update_data),
+            headers=get_auth_headers(admin_key),
+        )
+        assert response.status_code == 200
+
+        after = get_participants(client, expense_uuid)
+        assert list(after) == [user_uuids[0]]
+        assert after[user_uuids[0]]["id"] == before[user_uuids[0]]["id"]
+        assert float(after[user_uuids[0]]["share"]) == 100.00
+        assert ExpenseParticipant.query.count() == 1
+
+    def test_put_added_participant(self, client):
+        """Test PUT with a new participant - Should insert it and keep the existing one"""
+        admin_key, expense_uuid, user_uuids = create_split_expense(client, [(0, 100.00)])
+        before = get_participants(client, expense_uuid)
+
+        update_data = {
+            "amount": 100.00,
+            "description": "Split Expense",
+            "participants": [
+                {"user_id": user_uuids[0], "share": 100.00, "paid": 0.00},
+                {"user_id": user_uuids[1], "share": 0.00, "paid": 0.00},
+            ],
+        }
+        response = client.put(
+            f"/api/expenses/{expense_uuid}",
+            data=json.dumps(update_data),
+            headers=get_auth_headers(admin_key),
+        )
+        assert response.status_code == 200
+
+        after = get_participants(client, expense_uuid)
+        assert set(after) == set(user_uuids)
+        assert after[user_uuids[0]]["id"] == before[user_uuids[0]]["id"]
+        assert float(after[user_uuids[1]]["share"]) == 0.00
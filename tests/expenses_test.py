@@ -153,6 +153,53 @@ class TestExpenseEndpoints:
         msg = json.loads(response.data)["message"]
         assert "shares" in msg and "expense amount" in msg
 
+    def test_create_expense_even_three_way_split(self, client):
+        """Test POST /api/groups/<group_id>/expenses/ split three ways - Should accept a one-cent remainder"""
+        api_key = create_user(client)
+        create_user(client, name="User 2", email="user2@example.com")
+        create_user(client, name="User 3", email="user3@example.com")
+
+        response = client.post(
+            "/api/groups/",
+            data=json.dumps({"name": "Split Group"}),
+            headers=get_auth_headers(api_key),
+        )
+        group_uuid = json.loads(response.data)["id"]
+
+        user_uuids = [user.uuid for user in User.query.order_by(User.id).all()]
+        for user_uuid in user_uuids[1:]:
+            client.post(
+                f"/api/groups/{group_uuid}/members/",
+                data=json.dumps({"user_id": user_uuid, "role": "member"}),
+                headers=get_auth_headers(api_key),
+            )
+
+        # 3 x 33.33 = 99.99, one cent short of the amount
+        expense_data = {
+            "amount": 100.00,
+            "description": "Even Split",
+            "participants": [
+                {"user_id": user_uuid, "share": 33.33, "paid": 0.00}
+                for user_uuid in user_uuids
+            ],
+        }
+        expense_data["participants"][0]["paid"] = 100.00
+        response = client.post(
+            f"/api/groups/{group_uuid}/expenses/",
+            data=json.dumps(expense_data),
+            headers=get_auth_headers(api_key),
+        )
+        assert response.status_code == 201
+
+        # Two cents short is outside the tolerance
+        expense_data["participants"][2]["share"] = 33.32
+        response = client.post(
+            f"/api/groups/{group_uuid}/expenses/",
+            data=json.dumps(expense_data),
+            headers=get_auth_headers(api_key),
+        )
+        assert response.status_code == 400
+
 
 
     def test_get_expense_details(self, client):
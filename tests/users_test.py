@@ -28,6 +28,21 @@ class TestUserEndpoints:
         assert "@controls" in data
         assert "create" in data["@controls"]
 
+    def test_get_users_internal_error(self, client, monkeypatch):
+        """Test GET /api/users/ when the handler fails - Should return a JSON 500"""
+
+        def fail():
+            raise RuntimeError("listing failed")
+
+        # Answer the exception the way production does instead of re-raising it
+        monkeypatch.setitem(app.config, "PROPAGATE_EXCEPTIONS", False)
+        monkeypatch.setattr("expenses.resources.user.build_user_collection_controls", fail)
+
+        response = client.get("/api/users/")
+        assert response.status_code == 500
+        assert response.mimetype == "application/json"
+        assert "Internal Server Error" in json.loads(response.data)["message"]
+
     def test_create_user_valid(self, client):
         """Test POST /api/users/ with valid data - Should create a new user"""
         user_data = {